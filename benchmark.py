@@ -0,0 +1,304 @@
+# a benchmark of the figure functions, checked against the outputs recorded at the bottom of each script.
+# each case runs one function over the paper's parameter rows in a fresh process, and records
+#   - the wall time,
+#   - the hardness queries and estimator (attack) calls made, counted by instrumentation.py,
+#   - the peak resident memory of the process (ru_maxrss), which unlike tracemalloc includes the memory of sage, PARI and GMP,
+#     and only grows within a process, hence one process per case, and
+#   - the deviations from the recorded ("golden") values beyond a tolerance.
+# the hardness cache is disabled while benchmarking unless --cache is given, so that the estimator work is measured.
+#     python3 benchmark.py run before.json
+#     python3 benchmark.py run after.json --cases ind_cpa_d_flooding_noise_levels kr_d_flooding_noise_levels
+#     python3 benchmark.py compare before.json after.json
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import instrumentation
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# the parameter rows of Figs 1 and 2, and the subset used for Figs 3 and 4
+PARAMETERS = [
+    (10, 28, 3.19, 3.19),
+    (11, 55, 3.19, 3.19),
+    (12, 108, 3.19, 3.19),
+    (13, 216, 3.19, 3.19),
+    (14, 432, 3.19, 3.19),
+    (15, 870, 3.19, 3.19),
+    (16, 1749, 3.19, 3.19),
+    (17, 3525, 3.19, 3.19)
+]
+FLOODING_PARAMETERS = [parameters for parameters in PARAMETERS if parameters[0] in (10, 12, 14, 16)]
+SECURITY_LEVELS = [120, 100, 80]
+# (t, target security) of Figs 3 and 4
+IND_CPA_D_SETTINGS = (2 ** 6, 80)
+KR_D_SETTINGS = (2 ** 6, 120)
+
+# a value matches its golden value if |value - golden| <= ABSOLUTE_TOLERANCE + RELATIVE_TOLERANCE * |golden|
+ABSOLUTE_TOLERANCE = 1e-6
+RELATIVE_TOLERANCE = 1e-9
+
+# results and golden values are flattened to dicts from a path such as "decision_kappa_primes/12" to a float, or None when a
+# reduction gives nothing for that row
+
+def _trailing_comments(script):
+    with open(os.path.join(DIRECTORY, script)) as f:
+        lines = f.read().splitlines()
+    start = next(i for i, line in enumerate(lines) if line.startswith('if __name__ == "__main__":'))
+    return [line.lstrip("#").strip() for line in lines[start:] if line.startswith("#")]
+
+# the golden values of hintLWE_security.py, e.g. "original_security_levels/10" or "search_normalised_noise_flooding_stddev@80/13"
+def hint_lwe_golden():
+    golden = {}
+    logns = []
+    for line in _trailing_comments("hintLWE_security.py"):
+        match = re.fullmatch(r"(?:security_level=(\d+):\s*)?(\w+)=(\[.*\])", line)
+        if match is None:
+            continue
+        security_level, name, values = match.groups()
+        name = f"{name}@{security_level}" if security_level else name
+        values = dict(ast.literal_eval(values))
+        if name == "original_security_levels":
+            logns = list(values)
+        # rows missing from a list are those for which the reduction gives nothing
+        for logn in logns or values:
+            golden[f"{name}/{logn}"] = values.get(logn)
+    return golden
+
+# the golden values of ind_cpa_d_security.py or kr_d_security.py, e.g. "(12, 108, 3.19, 3.19)/additional/hint_lwe/5"
+def flooding_golden(script):
+    golden = {}
+    parameters, section = None, None
+    for line in _trailing_comments(script):
+        if line.startswith("parameters="):
+            parameters = str(ast.literal_eval(line[len("parameters="):]))
+        elif line.startswith("cross over point"):
+            golden[f"{parameters}/cross_over_point"] = float(line.rpartition(" at ")[2])
+        elif re.fullmatch(r"(absolute|additional) noise:?", line):
+            section = line.split()[0]
+        else:
+            match = re.fullmatch(r"(\w+)\s*[:=]\s*(\[.*\])", line)
+            if match is not None:
+                name, values = match.groups()
+                for rescaled_noise_magnitude, value in ast.literal_eval(values):
+                    golden[f"{parameters}/{section}/{name}/{rescaled_noise_magnitude}"] = value
+    return golden
+
+def _by_logn(name, parameters, values):
+    values = dict(values)
+    return {f"{name}/{logn}": None if values.get(logn) is None else float(values[logn]) for (logn, _, _, _) in parameters}
+
+def _flooding_values(parameter_sets, table):
+    values = {}
+    for parameters, (cross_over_point, absolute_noise, additional_noise) in zip(parameter_sets, table):
+        values[f"{parameters}/cross_over_point"] = float(cross_over_point)
+        for section, noise in (("absolute", absolute_noise), ("additional", additional_noise)):
+            for name, curve in noise.items():
+                for rescaled_noise_magnitude, value in curve:
+                    values[f"{parameters}/{section}/{name}/{rescaled_noise_magnitude}"] = float(value)
+    return values
+
+# the original security of each row, as recorded in hintLWE_security.py: the cases below start from these, so that each case
+# only measures its own function
+def _original_security(golden, parameters):
+    return [(logn, golden[f"original_security_levels/{logn}"]) for (logn, _, _, _) in parameters]
+
+# the cases: each takes the parameter rows and the golden values, and returns its flattened results
+
+def original_bit_security_levels_case(parameters, golden):
+    from hintLWE_security import original_bit_security_levels
+    return _by_logn("original_security_levels", parameters, original_bit_security_levels(parameters))
+
+def hint_lwe_decision_security_levels_case(parameters, golden):
+    from hintLWE_security import hint_lwe_decision_security_levels
+    kappa_primes, stddevs = hint_lwe_decision_security_levels(parameters, _original_security(golden, parameters), search="bisect")
+    return dict(_by_logn("decision_kappa_primes", parameters, kappa_primes), **_by_logn("decision_normalised_flooding_stddevs", parameters, stddevs))
+
+def hint_lwe_search_security_levels_case(parameters, golden):
+    from hintLWE_security import hint_lwe_search_security_levels
+    kappa_primes, stddevs = hint_lwe_search_security_levels(parameters)
+    return dict(_by_logn("search_kappa_primes", parameters, kappa_primes), **_by_logn("search_normalised_flooding_stddevs", parameters, stddevs))
+
+def hint_lwe_decision_normalised_noise_flooding_case(parameters, golden):
+    from hintLWE_security import hint_lwe_decision_normalised_noise_flooding
+    values = {}
+    for security_level in SECURITY_LEVELS:
+        stddevs = hint_lwe_decision_normalised_noise_flooding(parameters, security_level)
+        values.update(_by_logn(f"decision_normalised_noise_flooding_stddev@{security_level}", parameters, stddevs))
+    return values
+
+def hint_lwe_search_normalised_noise_flooding_case(parameters, golden):
+    from hintLWE_security import hint_lwe_search_normalised_noise_flooding
+    values = {}
+    for security_level in SECURITY_LEVELS:
+        stddevs = hint_lwe_search_normalised_noise_flooding(parameters, security_level)
+        values.update(_by_logn(f"search_normalised_noise_flooding_stddev@{security_level}", parameters, stddevs))
+    return values
+
+# the same values, from the variants sharing hardness evaluations between the security levels
+def hint_lwe_decision_normalised_noise_flooding_levels_case(parameters, golden):
+    from hintLWE_security import hint_lwe_decision_normalised_noise_flooding_levels
+    stddevs = hint_lwe_decision_normalised_noise_flooding_levels(parameters, SECURITY_LEVELS)
+    values = {}
+    for security_level in SECURITY_LEVELS:
+        values.update(_by_logn(f"decision_normalised_noise_flooding_stddev@{security_level}", parameters, stddevs[security_level]))
+    return values
+
+def hint_lwe_search_normalised_noise_flooding_levels_case(parameters, golden):
+    from hintLWE_security import hint_lwe_search_normalised_noise_flooding_levels
+    stddevs = hint_lwe_search_normalised_noise_flooding_levels(parameters, SECURITY_LEVELS)
+    values = {}
+    for security_level in SECURITY_LEVELS:
+        values.update(_by_logn(f"search_normalised_noise_flooding_stddev@{security_level}", parameters, stddevs[security_level]))
+    return values
+
+def ind_cpa_d_flooding_noise_levels_case(parameters, golden):
+    from ind_cpa_d_security import flooding_noise_levels_table
+    parameters = [row for row in parameters if row in FLOODING_PARAMETERS]
+    original_security = [security for _, security in _original_security(golden, parameters)]
+    return _flooding_values(parameters, flooding_noise_levels_table(parameters, IND_CPA_D_SETTINGS[0], original_security, IND_CPA_D_SETTINGS[1]))
+
+def kr_d_flooding_noise_levels_case(parameters, golden):
+    from kr_d_security import flooding_noise_levels_table
+    parameters = [row for row in parameters if row in FLOODING_PARAMETERS]
+    original_security = [security for _, security in _original_security(golden, parameters)]
+    return _flooding_values(parameters, flooding_noise_levels_table(parameters, KR_D_SETTINGS[0], original_security, KR_D_SETTINGS[1]))
+
+# case name -> (function, the script holding its golden values)
+CASES = {
+    "original_bit_security_levels": (original_bit_security_levels_case, "hintLWE_security.py"),
+    "hint_lwe_decision_security_levels": (hint_lwe_decision_security_levels_case, "hintLWE_security.py"),
+    "hint_lwe_search_security_levels": (hint_lwe_search_security_levels_case, "hintLWE_security.py"),
+    "hint_lwe_decision_normalised_noise_flooding": (hint_lwe_decision_normalised_noise_flooding_case, "hintLWE_security.py"),
+    "hint_lwe_search_normalised_noise_flooding": (hint_lwe_search_normalised_noise_flooding_case, "hintLWE_security.py"),
+    "hint_lwe_decision_normalised_noise_flooding_levels": (hint_lwe_decision_normalised_noise_flooding_levels_case, "hintLWE_security.py"),
+    "hint_lwe_search_normalised_noise_flooding_levels": (hint_lwe_search_normalised_noise_flooding_levels_case, "hintLWE_security.py"),
+    "ind_cpa_d_flooding_noise_levels": (ind_cpa_d_flooding_noise_levels_case, "ind_cpa_d_security.py"),
+    "kr_d_flooding_noise_levels": (kr_d_flooding_noise_levels_case, "kr_d_security.py"),
+}
+
+def golden_values(script):
+    return hint_lwe_golden() if script == "hintLWE_security.py" else flooding_golden(script)
+
+# the paths where values and golden disagree, as (path, value, golden). Paths without a golden value are not checked
+def golden_mismatches(values, golden, absolute_tolerance=ABSOLUTE_TOLERANCE, relative_tolerance=RELATIVE_TOLERANCE):
+    mismatches = []
+    for path, value in values.items():
+        if path not in golden:
+            continue
+        expected = golden[path]
+        if value is None or expected is None:
+            matches = value is None and expected is None
+        else:
+            matches = abs(value - expected) <= absolute_tolerance + relative_tolerance * abs(expected)
+        if not matches:
+            mismatches.append((path, value, expected))
+    return mismatches
+
+# the peak resident memory of this process in bytes: ru_maxrss is in KiB on Linux, and in bytes on macOS
+def _peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+# run a case in a fresh process, see _run_case
+def run_case(name, parameters):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_run_case, name, parameters).result()
+
+def _run_case(name, parameters):
+    function, script = CASES[name]
+    golden = golden_values(script)
+    # the original security levels the cases start from are always read from hintLWE_security.py
+    inputs = dict(golden, **hint_lwe_golden())
+    start = time.perf_counter()
+    with instrumentation.instrument() as recorder:
+        values = function(parameters, inputs)
+    wall_time = time.perf_counter() - start
+    peak_memory = _peak_rss()
+    mismatches = golden_mismatches(values, golden)
+    return {
+        "wall_time": wall_time,
+        "hardness_queries": recorder.counters.get("hardness_queries", 0),
+        "estimator_calls": sum(calls for timer, (calls, _, _) in recorder.timers.items() if timer.startswith("attack:")),
+        "cache_hits": recorder.counters.get("cache_hits", 0),
+        "peak_memory": peak_memory,
+        "checked": sum(path in golden for path in values),
+        "mismatches": mismatches,
+        "values": values,
+    }
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=DIRECTORY, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(names, parameters, cache=False):
+    if not cache:
+        os.environ["HINTLWE_CACHE"] = "0"
+    results = {"revision": _git_revision(), "python": platform.python_version(), "parameters": parameters, "cache": cache, "cases": {}}
+    for name in names:
+        print(f"# running {name}", flush=True)
+        case = run_case(name, parameters)
+        results["cases"][name] = case
+        print(f"# {name}: {case['wall_time']:.2f}s, {case['estimator_calls']} estimator calls, "
+              f"{case['peak_memory'] / 2 ** 20:.1f} MiB peak, {len(case['mismatches'])} of {case['checked']} golden values differ", flush=True)
+        for path, value, expected in case["mismatches"][:10]:
+            print(f"#\t{path}: {value} (golden {expected})")
+    return results
+
+# a table comparing the cases of two benchmark runs
+def comparison_report(before, after):
+    lines = [f"# before: {before.get('revision')}", f"# after:  {after.get('revision')}"]
+    header = f"{'case':<45} {'time (s)':>21} {'ratio':>7} {'estimator calls':>17} {'peak MiB':>15} {'mismatches':>11}"
+    lines += [header, "-" * len(header)]
+    for name in list(before["cases"]) + [name for name in after["cases"] if name not in before["cases"]]:
+        old, new = before["cases"].get(name), after["cases"].get(name)
+        if old is None or new is None:
+            lines.append(f"{name:<45} only in the {'after' if old is None else 'before'} run")
+            continue
+        ratio = new["wall_time"] / old["wall_time"] if old["wall_time"] else float("inf")
+        lines.append(
+            f"{name:<45} {old['wall_time']:>10.2f}{new['wall_time']:>11.2f} {ratio:>7.2f} "
+            f"{old['estimator_calls']:>8}{new['estimator_calls']:>9} "
+            f"{old['peak_memory'] / 2 ** 20:>7.1f}{new['peak_memory'] / 2 ** 20:>8.1f} "
+            f"{len(old['mismatches']):>5}{len(new['mismatches']):>6}"
+        )
+        # values that changed between the runs, whether or not they have a golden value
+        changed = golden_mismatches(new["values"], old["values"])
+        if changed:
+            lines.append(f"    {len(changed)} values changed, e.g. {changed[0][0]}: {changed[0][2]} -> {changed[0][1]}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark the figure functions against their recorded outputs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run the benchmarks and write the results to a JSON file")
+    run.add_argument("output")
+    run.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    run.add_argument("--max-logn", type=int, default=17, help="only benchmark the parameter rows with logn up to this")
+    run.add_argument("--cache", action="store_true", help="serve hardness estimates from the hardness cache")
+    compare = commands.add_parser("compare", help="compare two benchmark runs")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    arguments = parser.parse_args()
+
+    if arguments.command == "run":
+        parameters = [row for row in PARAMETERS if row[0] <= arguments.max_logn]
+        results = run_benchmarks(arguments.cases, parameters, arguments.cache)
+        with open(arguments.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        with open(arguments.before) as f:
+            before = json.load(f)
+        with open(arguments.after) as f:
+            after = json.load(f)
+        print(comparison_report(before, after))
@@ -0,0 +1,52 @@
+# a heuristic estimate of |[a]_q / q|^can_2, the squared spectral norm of the hint matrix, for comparison with worst_case_ATA.
+# for a in Z_q[X] / (X^n + 1), multiplication by a has singular values |sigma_j(a)|, where sigma_j(a) = a(zeta^(2j + 1)) and zeta is a
+# primitive 2n-th root of unity. We sample uniform a, reduce to [a]_q / q in [-1/2, 1/2), and evaluate all the sigma_j at once with
+# one FFT of length n per sample (after twisting the coefficients by zeta^i), in chunks to bound memory.
+# each sigma_j(a) is a sum of n independent terms, so by the central limit theorem it is close to a complex Gaussian: |sigma_j(a)|^2 is
+# then close to exponential with mean v, and a union bound over the n / 2 conjugate pairs gives
+#     P(max_j |sigma_j(a)|^2 > v * (ln(n / 2) - ln(failure_probability))) <= failure_probability.
+# heuristic_ATA_bound estimates v from the samples and checks the largest sampled norm against this. This is not a bound: the Gaussian
+# approximation says nothing rigorous about tails as small as 2^-40, and v is itself estimated. It must not replace worst_case_ATA
+# in a security claim, which is why the flooding noise functions keep worst_case_ATA as their default.
+import math
+import numpy as np
+
+# the largest chunk of complex evaluations held in memory at once
+CHUNK_BYTES = 2 ** 28
+
+# [a]_q / q for `count` uniform a: q=None samples the continuous limit, which is what large moduli (beyond 2^53) give in floats
+def _normalised_uniform(rng, count, n, q=None):
+    if q is None or q > 2 ** 53:
+        return rng.random((count, n)) - 0.5
+    return rng.integers(-(q // 2), q - q // 2, size=(count, n)) / q
+
+# max_j |sigma_j([a]_q / q)|^2 for each of `samples` uniform a, and the mean of |sigma_j|^2 over all samples and j
+def canonical_spectral_norms(n, samples, q=None, seed=None, chunk_bytes=CHUNK_BYTES):
+    rng = np.random.default_rng(seed)
+    twist = np.exp(1j * np.pi * np.arange(n) / n)
+    chunk = max(1, chunk_bytes // (16 * n))
+    norms = np.empty(samples)
+    total = 0.0
+    for start in range(0, samples, chunk):
+        count = min(chunk, samples - start)
+        evaluations = np.fft.fft(_normalised_uniform(rng, count, n, q) * twist, axis=1)
+        squares = evaluations.real ** 2 + evaluations.imag ** 2
+        norms[start:start + count] = squares.max(axis=1)
+        total += squares.sum()
+    return norms, total / (samples * n)
+
+# a heuristic estimate of |[a]_q / q|^can_2 for a ring dimension of n (and modulus q, None for the continuous limit), exceeded with
+# probability about failure_probability under the Gaussian approximation above, from `samples` sampled hint polynomials
+def heuristic_ATA_bound(n, q=None, samples=1000, failure_probability=2 ** -40, seed=None):
+    norms, mean_square = canonical_spectral_norms(n, samples, q, seed)
+    bound = mean_square * (math.log(n / 2) - math.log(failure_probability))
+    return max(bound, float(norms.max()))
+
+if __name__ == "__main__":
+    from ind_cpa_d_security import worst_case_ATA
+    for logn in range(10, 18):
+        n = 2 ** logn
+        norms, mean_square = canonical_spectral_norms(n, 1000, seed=logn)
+        bound = heuristic_ATA_bound(n, seed=logn)
+        print(f"# {logn=}: mean |sigma_j|^2 = {mean_square:.1f} (n / 12 = {n / 12:.1f}), largest of 1000 samples = {norms.max():.1f}, "
+              f"heuristic = {bound:.1f} = 2^{math.log2(bound):.2f}, worst case = 2^{math.log2(worst_case_ATA(n)):.2f}")
@@ -0,0 +1,223 @@
+# distributed hardness sweeps over a shared directory. A coordinator splits each parameter row into one work unit per attack
+# (see utils.attack_names), and workers on any node with access to the directory claim units, run them and write their outcomes.
+# the coordinator then merges the outcomes of each row into its hardness, stored in the sweep file of sweep.original_security and
+# in the hardness cache, so that the scripts pick them up as if they had been computed locally.
+# the queue is a directory with three subdirectories:
+#   pending/<unit>.<attempt>.json   units waiting for a worker
+#   claimed/<unit>.<attempt>.json   units being run: a worker claims a unit by renaming it here, and touches it while it runs
+#   done/<unit>.json                the outcome of each finished unit
+# renames within a file system are atomic, so each unit is claimed by a single worker. A claimed unit whose file has not been
+# touched for `lease` seconds belongs to a worker that died: any worker or the coordinator moves it back to pending with its
+# attempt increased, and gives up on it after MAX_ATTEMPTS. An abandoned unit is recorded as a timeout, so its row is never merged:
+# the minimum over the other attacks would overstate the hardness.
+#     python3 distributed.py submit <directory>      queue the rows of Figs 1 and 2
+#     python3 distributed.py worker <directory>      run units until the queue is empty
+#     python3 distributed.py merge <directory>       merge the finished rows
+#     python3 distributed.py status <directory>
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from sweep import load_sweep, results_path, row_key
+
+LEASE = 600
+MAX_ATTEMPTS = 3
+
+class WorkQueue:
+    def __init__(self, directory, lease=LEASE, max_attempts=MAX_ATTEMPTS):
+        self.directory = directory
+        self.lease = lease
+        self.max_attempts = max_attempts
+        for state in ("pending", "claimed", "done"):
+            os.makedirs(os.path.join(directory, state), exist_ok=True)
+
+    def _path(self, state, name):
+        return os.path.join(self.directory, state, name)
+
+    def _write(self, path, record):
+        with open(path + f".{socket.gethostname()}.{os.getpid()}.tmp", "w") as f:
+            json.dump(record, f)
+        os.replace(path + f".{socket.gethostname()}.{os.getpid()}.tmp", path)
+
+    @staticmethod
+    def unit_id(row, attack):
+        return hashlib.sha256(json.dumps([list(row), attack]).encode()).hexdigest()[:24]
+
+    # unit id -> (state, file name) for every unit in the queue
+    def units(self):
+        units = {}
+        for state in ("done", "claimed", "pending"):
+            for name in os.listdir(os.path.join(self.directory, state)):
+                if name.endswith(".json"):
+                    units.setdefault(name.split(".")[0], (state, name))
+        return units
+
+    # queue a unit per (row, attack), skipping those already queued, running or done
+    def submit(self, rows):
+        from utils import attack_names
+        units = self.units()
+        submitted = 0
+        for row in rows:
+            for attack in attack_names(row[0]):
+                unit = self.unit_id(row, attack)
+                if unit not in units:
+                    self._write(self._path("pending", f"{unit}.1.json"), {"row": list(row), "attack": attack})
+                    submitted += 1
+        return submitted
+
+    # move the units whose lease expired back to pending, or to done as a timeout once they have used all their attempts
+    def requeue_expired(self):
+        now = time.time()
+        for name in os.listdir(os.path.join(self.directory, "claimed")):
+            path = self._path("claimed", name)
+            try:
+                if now - os.path.getmtime(path) < self.lease:
+                    continue
+                unit, attempt, _ = name.split(".")
+                if int(attempt) < self.max_attempts:
+                    os.rename(path, self._path("pending", f"{unit}.{int(attempt) + 1}.json"))
+                else:
+                    with open(path) as f:
+                        record = json.load(f)
+                    record["outcome"] = ["timeout", f"abandoned after {attempt} attempts"]
+                    self._write(self._path("done", f"{unit}.json"), record)
+                    os.remove(path)
+            except FileNotFoundError:
+                # someone else got there first
+                pass
+
+    # claim a pending unit: returns (file name, record), or None if there are none
+    def claim(self):
+        self.requeue_expired()
+        for name in sorted(os.listdir(os.path.join(self.directory, "pending"))):
+            if not name.endswith(".json"):
+                continue
+            try:
+                os.rename(self._path("pending", name), self._path("claimed", name))
+            except FileNotFoundError:
+                continue
+            try:
+                # renaming keeps the modification time: start the lease now
+                os.utime(self._path("claimed", name))
+                with open(self._path("claimed", name)) as f:
+                    record = json.load(f)
+            except FileNotFoundError:
+                # another worker saw the old modification time and requeued the unit before we started the lease
+                continue
+            if os.path.exists(self._path("done", f"{name.split('.')[0]}.json")):
+                # a worker whose lease expired finished it after all
+                os.remove(self._path("claimed", name))
+                continue
+            return name, record
+        return None
+
+    def finish(self, name, record, outcome):
+        record = dict(record, outcome=list(outcome), worker=f"{socket.gethostname()}:{os.getpid()}")
+        self._write(self._path("done", f"{name.split('.')[0]}.json"), record)
+        try:
+            os.remove(self._path("claimed", name))
+        except FileNotFoundError:
+            # the lease expired while we ran, and the unit was requeued or abandoned: the outcome is written all the same
+            pass
+
+    def _heartbeat(self, name, stopped):
+        while not stopped.wait(self.lease / 4):
+            try:
+                os.utime(self._path("claimed", name))
+            except FileNotFoundError:
+                return
+
+    # run units until the queue is empty, or forever (polling every `poll` seconds) if wait is True. Returns the number of units run
+    def work(self, wait=False, poll=10):
+        from utils import attack_outcome
+        finished = 0
+        while True:
+            claimed = self.claim()
+            if claimed is None:
+                if not wait and not os.listdir(os.path.join(self.directory, "claimed")):
+                    return finished
+                time.sleep(poll)
+                continue
+            name, record = claimed
+            stopped = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(name, stopped), daemon=True)
+            heartbeat.start()
+            try:
+                outcome = attack_outcome(record["attack"], *record["row"])
+            finally:
+                stopped.set()
+                heartbeat.join()
+            self.finish(name, record, outcome)
+            finished += 1
+            print(f"# finished {record['attack']} for {tuple(record['row'])}: {outcome}", flush=True)
+
+    # the outcomes of the finished units, as a dict from row (a tuple) to {attack: outcome}
+    def outcomes(self):
+        outcomes = {}
+        for name in os.listdir(os.path.join(self.directory, "done")):
+            if name.endswith(".json"):
+                with open(self._path("done", name)) as f:
+                    record = json.load(f)
+                outcomes.setdefault(tuple(record["row"]), {})[record["attack"]] = tuple(record["outcome"])
+        return outcomes
+
+    # the number of units in each state
+    def status(self):
+        counts = {"pending": 0, "claimed": 0, "done": 0}
+        for state, _ in self.units().values():
+            counts[state] += 1
+        return counts
+
+    # merge every row whose attacks have all finished: its hardness is appended to the sweep file at `path` (by default that of
+    # sweep.original_security) and its report stored in the hardness cache. Rows with an abandoned attack (see requeue_expired) are
+    # skipped, and rows where an attack failed are not cached, as in utils.HE_standard_LWE_hardness_report.
+    # Returns a dict from the merged rows to their hardness
+    def merge(self, path=None):
+        from utils import attack_names, HardnessReport, store_hardness_report
+        path = path or results_path("original_security")
+        done = load_sweep(path)
+        merged = {}
+        for row, outcomes in self.outcomes().items():
+            names = attack_names(row[0])
+            if row_key(row) in done or any(name not in outcomes for name in names):
+                continue
+            report = HardnessReport.from_outcomes({name: outcomes[name] for name in names})
+            if report.partial:
+                continue
+            if report.complete:
+                store_hardness_report(*row, report)
+            # as sweep.original_security writes it, including inf when no attack finished
+            merged[row] = float(report.min_cost)
+        if merged:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a") as f:
+                for row, hardness in merged.items():
+                    f.write(json.dumps({"row": list(row), "result": hardness}) + "\n")
+        return merged
+
+if __name__ == "__main__":
+    command, directory = sys.argv[1], sys.argv[2]
+    queue = WorkQueue(directory)
+    if command == "submit":
+        # the rows of Figs 1 and 2, as in sweep.py
+        parameters = [
+            (10, 28, 3.19, 3.19),
+            (11, 55, 3.19, 3.19),
+            (12, 108, 3.19, 3.19),
+            (13, 216, 3.19, 3.19),
+            (14, 432, 3.19, 3.19),
+            (15, 870, 3.19, 3.19),
+            (16, 1749, 3.19, 3.19),
+            (17, 3525, 3.19, 3.19)
+        ]
+        print(f"# submitted {queue.submit(parameters)} units")
+    elif command == "worker":
+        print(f"# ran {queue.work()} units")
+    elif command == "merge":
+        queue.requeue_expired()
+        merged = queue.merge()
+        print(f"# merged {len(merged)} rows: {merged}")
+    print(f"# {queue.status()}")
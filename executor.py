@@ -0,0 +1,28 @@
+# a shared executor layer for the figure pipelines: each (logn, logq, sigma_s, sigma_e) row is independent,
+# so we fan rows out across processes, report progress as rows finish, and return the results in input order.
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# call function(*args) for each args in rows, yielding (index, result) pairs in the order in which they finish.
+# workers: the number of processes to use. With workers=1 everything runs in this process
+def imap_rows(function, rows, workers=1):
+    rows = list(rows)
+    if workers == 1:
+        for index, args in enumerate(rows):
+            yield index, function(*args)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(function, *args): index for index, args in enumerate(rows)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+# as imap_rows, but returns a list of results in input order.
+# progress: print a line as each row finishes, labelled by `label`
+def map_rows(function, rows, workers=1, progress=True, label=None):
+    rows = list(rows)
+    results = [None] * len(rows)
+    label = label or function.__name__
+    for finished, (index, result) in enumerate(imap_rows(function, rows, workers), start=1):
+        results[index] = result
+        if progress:
+            print(f"# {label}: finished row {index} ({finished}/{len(rows)})", flush=True)
+    return results
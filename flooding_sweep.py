@@ -0,0 +1,118 @@
+# vectorised versions of the flooding noise curves of ind_cpa_d_security and kr_d_security, for sweeps over millions of
+# (logn, t, rescaled noise magnitude, target security) combinations. All inputs are NumPy arrays (or scalars), broadcast against
+# each other, and every output has the broadcast shape. Where a method does not apply (e.g. the gap between the original and target
+# security is too small), the output is NaN.
+# these agree with the scalar formulas to within TOLERANCE bits: run this file to check.
+# the HintLWE curves need the normalised flooding stddev for each (logn, target security), which comes from the lattice estimator
+# via hintLWE_security: it is an input here, so that this file only needs NumPy.
+import math
+import numpy as np
+
+TOLERANCE = 1e-9
+
+def worst_case_ATA(n):
+    return (2 * n / np.pi) ** 2 + 1
+
+def sigma_i(t, ATA_bound, log_normalised_flooding_stddev):
+    return 0.5 * np.log2(t) + 0.5 * np.log2(ATA_bound) + log_normalised_flooding_stddev
+
+# a (2 norm) bound on the noise due to rescaling, ([A]_q * s - [b]_q ) / q
+def rescaling_noise(logn, sigma_s):
+    n = 2.0 ** np.asarray(logn)
+    return np.sqrt(worst_case_ATA(n)) * np.sqrt(n) * sigma_s + 0.5
+
+def additional_precision_loss(logn, log_sigma, log_total_noise):
+    return np.asarray(logn) / 2 + log_sigma - log_total_noise
+
+def _log_total_noise(logn, sigma_s, rescaled_noise_magnitude):
+    return np.log2(2.0 ** np.asarray(rescaled_noise_magnitude) + rescaling_noise(logn, sigma_s))
+
+# the IND-CPA-D flooding noise of ind_cpa_d_security.flooding_noise_levels, returned as (absolute_noise, additional_noise):
+# dicts from "prior", "bit_security" and "hint_lwe" to arrays of bits
+def ind_cpa_d_flooding_noise(logn, sigma_s, t, rescaled_noise_magnitude, original_security, target_security, log_normalised_flooding_stddev):
+    logn, sigma_s, t, rescaled_noise_magnitude, original_security, target_security, log_normalised_flooding_stddev = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (logn, sigma_s, t, rescaled_noise_magnitude, original_security, target_security, log_normalised_flooding_stddev))
+    )
+    log_total_noise = _log_total_noise(logn, sigma_s, rescaled_noise_magnitude)
+    gap = original_security - target_security
+
+    absolute_noise = {
+        # prior result requires gap between IND-CPA and IND-CPA-D security at least 8
+        "prior": np.where(gap >= 8, log_total_noise + target_security / 2 + 0.5 * np.log2(64 * t), np.nan),
+        # our bit security result requires a gap between IND-CPA and IND-CPA-D security at least 4
+        "bit_security": np.where(gap >= 4, log_total_noise + target_security / 2 + 0.5 * math.log2(4), np.nan),
+        "hint_lwe": np.maximum(
+            rescaled_noise_magnitude + target_security / 2 + 0.5 * math.log2(4),
+            sigma_i(t, worst_case_ATA(2.0 ** logn), log_normalised_flooding_stddev),
+        ),
+    }
+    additional_noise = {key: additional_precision_loss(logn, value, log_total_noise) for key, value in absolute_noise.items()}
+    return absolute_noise, additional_noise
+
+def _kr_d_bit_security_flooding_noise(t, logE, original_security, target_security):
+    l = original_security - target_security
+    with np.errstate(invalid="ignore", divide="ignore"):
+        noise = np.log2(2 * original_security * t * math.log2(math.e)) / 2 + logE - np.log2(l)
+    return np.where(l >= 1, noise, np.nan)
+
+# the KR-D flooding noise of kr_d_security.flooding_noise_levels, returned as (absolute_noise, additional_noise):
+# dicts from "bit_security" and "hint_lwe" to arrays of bits
+def kr_d_flooding_noise(logn, sigma_s, t, rescaled_noise_magnitude, original_security, target_security, log_normalised_flooding_stddev):
+    logn, sigma_s, t, rescaled_noise_magnitude, original_security, target_security, log_normalised_flooding_stddev = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (logn, sigma_s, t, rescaled_noise_magnitude, original_security, target_security, log_normalised_flooding_stddev))
+    )
+    log_total_noise = _log_total_noise(logn, sigma_s, rescaled_noise_magnitude)
+    # this is the security we target for HintLWE (Search)
+    kappa_prime = target_security + 1
+
+    absolute_noise = {
+        "bit_security": _kr_d_bit_security_flooding_noise(t, log_total_noise, original_security, target_security),
+        "hint_lwe": np.maximum(
+            _kr_d_bit_security_flooding_noise(t, rescaled_noise_magnitude, kappa_prime, target_security),
+            sigma_i(t, worst_case_ATA(2.0 ** logn), log_normalised_flooding_stddev),
+        ),
+    }
+    additional_noise = {key: additional_precision_loss(logn, value, log_total_noise) for key, value in absolute_noise.items()}
+    return absolute_noise, additional_noise
+
+if __name__ == "__main__":
+    # we check the vectorised curves against the scalar formulas on a grid, using a made-up HintLWE flooding stddev
+    import ind_cpa_d_security
+    import kr_d_security
+
+    logn, t, magnitude, target_security = np.meshgrid(np.arange(10, 18), 2.0 ** np.arange(0, 21, 4), np.arange(1, 41), np.arange(60, 125, 8), indexing="ij")
+    sigma_s, original_security = 3.19, 128.0
+    log_normalised_flooding_stddev = 0.03 * target_security - 0.1 * logn
+
+    def scalar_ind_cpa_d(logn, t, magnitude, target_security, stddev):
+        n = 2 ** logn
+        log_total_noise = math.log2(2 ** magnitude + math.sqrt(ind_cpa_d_security.worst_case_ATA(n)) * math.sqrt(n) * sigma_s + 0.5)
+        absolute = {
+            "prior": ind_cpa_d_security.prior_flooding_noise(t, log_total_noise, target_security) if original_security - target_security >= 8 else math.nan,
+            "bit_security": ind_cpa_d_security.bit_security_flooding_noise(log_total_noise, target_security) if original_security - target_security >= 4 else math.nan,
+            "hint_lwe": ind_cpa_d_security.hint_lwe_flooding_noise(t, magnitude, target_security, n, stddev),
+        }
+        return {key: (value, ind_cpa_d_security.additional_precision_loss(logn, value, log_total_noise)) for key, value in absolute.items()}
+
+    def scalar_kr_d(logn, t, magnitude, target_security, stddev):
+        n = 2 ** logn
+        log_total_noise = math.log2(2 ** magnitude + math.sqrt(ind_cpa_d_security.worst_case_ATA(n)) * math.sqrt(n) * sigma_s + 0.5)
+        absolute = {
+            "bit_security": kr_d_security.bit_security_flooding_noise(t, log_total_noise, original_security, target_security),
+            "hint_lwe": kr_d_security.hint_lwe_flooding_noise(t, magnitude, target_security + 1, target_security, n, stddev),
+        }
+        return {key: (value, ind_cpa_d_security.additional_precision_loss(logn, value, log_total_noise)) for key, value in absolute.items()}
+
+    for name, vectorised, scalar in [("ind_cpa_d", ind_cpa_d_flooding_noise, scalar_ind_cpa_d), ("kr_d", kr_d_flooding_noise, scalar_kr_d)]:
+        absolute_noise, additional_noise = vectorised(logn, sigma_s, t, magnitude, original_security, target_security, log_normalised_flooding_stddev)
+        deviation = 0
+        for index in np.ndindex(logn.shape):
+            expected = scalar(int(logn[index]), float(t[index]), int(magnitude[index]), float(target_security[index]), float(log_normalised_flooding_stddev[index]))
+            for key, (absolute, additional) in expected.items():
+                for got, want in [(absolute_noise[key][index], absolute), (additional_noise[key][index], additional)]:
+                    if math.isnan(want):
+                        assert math.isnan(got)
+                    else:
+                        deviation = max(deviation, abs(got - want))
+        print(f"# {name}: {logn.size} points, largest deviation from the scalar formulas {deviation} bits")
+        assert deviation < TOLERANCE
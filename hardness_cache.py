@@ -0,0 +1,187 @@
+# a persistent, content-addressed cache for LWE hardness estimates.
+# entries are keyed on the LWE parameters, the attacks considered, the reduction cost model and the version of the lattice estimator,
+# and hold the cost (in bits) of each attack as well as the minimum over all attacks.
+# this file deliberately does not import sage or the estimator, so that it can be used from lightweight tools.
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from functools import lru_cache
+
+# bump this if the layout of a cache entry changes
+CACHE_FORMAT = 2
+
+# with max_bytes set, the size of the cache is tracked from this process's own writes, and only measured by walking the whole cache
+# (which is slow for large or network caches) once the tracked size exceeds max_bytes, or every RESYNC_PUTS writes to pick up the
+# writes of other processes
+RESYNC_PUTS = 1000
+# eviction frees space down to this fraction of max_bytes, so that a full cache is not walked again on the next write
+EVICT_TO = 0.9
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".hardness_cache")
+
+# a version string for the lattice estimator found at `path`: the git commit if we can find one, and a hash of the source otherwise
+@lru_cache(maxsize=None)
+def estimator_version(path):
+    try:
+        commit = subprocess.run(["git", "-C", path, "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        if commit:
+            return commit
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    digest = hashlib.sha256()
+    for root, dirs, files in sorted(os.walk(path)):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".py"):
+                with open(os.path.join(root, name), "rb") as f:
+                    digest.update(name.encode())
+                    digest.update(f.read())
+    return "source-" + digest.hexdigest()
+
+class HardnessCache:
+    # directory: where entries are stored, one json file per entry
+    # max_bytes: if set, the least recently used entries are evicted once the cache grows beyond this size
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size_estimate = None
+        self._puts_since_walk = 0
+
+    # the content address of a hardness query. Parameters are normalised to floats, so that sage and python numbers agree
+    @staticmethod
+    def key(logn, logQ, secret_sigma, error_sigma, attacks, cost_model, estimator_version):
+        description = {
+            "format": CACHE_FORMAT,
+            "params": [int(logn), int(logQ), repr(float(secret_sigma)), repr(float(error_sigma))],
+            "attacks": attacks,
+            "cost_model": cost_model,
+            "estimator": estimator_version,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    # the address of the attack history of a (logn, logQ) regime: how often each attack was the cheapest, see utils.attack_order
+    @staticmethod
+    def history_key(logn, logQ, attacks, cost_model, estimator_version):
+        description = {
+            "format": CACHE_FORMAT,
+            "history": [int(logn), int(logQ)],
+            "attacks": attacks,
+            "cost_model": cost_model,
+            "estimator": estimator_version,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    # returns the stored entry, or None on a miss. Unreadable entries (e.g. from an older format) count as misses
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if entry.get("format") != CACHE_FORMAT:
+            self.misses += 1
+            return None
+        # mark the entry as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    # entries are written to a temporary file and atomically moved into place, so that concurrent writers
+    # (e.g. several sweeps sharing a cache) never leave a partially written entry behind
+    def put(self, key, entry):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(dict(entry, format=CACHE_FORMAT), sort_keys=True).encode()
+        try:
+            old_size = os.stat(path).st_size
+        except OSError:
+            old_size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        if self.max_bytes is not None:
+            self._account(len(data) - old_size)
+
+    def _account(self, delta):
+        self._puts_since_walk += 1
+        if self._size_estimate is None or self._puts_since_walk >= RESYNC_PUTS:
+            self._size_estimate = self.size()
+            self._puts_since_walk = 0
+        else:
+            self._size_estimate += delta
+        if self._size_estimate > self.max_bytes:
+            self._size_estimate = self.evict(int(self.max_bytes * EVICT_TO))
+            self._puts_since_walk = 0
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed by a concurrent eviction
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    # remove the least recently used entries until the cache holds at most max_bytes. Returns the size left
+    def evict(self, max_bytes):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        return total
+
+    def clear(self):
+        self.evict(0)
+
+_default_cache = None
+
+# the cache used by utils.HE_standard_LWE_hardness. This can be configured with the environment variables
+# HINTLWE_CACHE_DIR, HINTLWE_CACHE_MAX_BYTES, and HINTLWE_CACHE=0 to disable caching altogether
+def default_cache():
+    global _default_cache
+    if os.environ.get("HINTLWE_CACHE", "1") == "0":
+        return None
+    if _default_cache is None:
+        max_bytes = os.environ.get("HINTLWE_CACHE_MAX_BYTES")
+        _default_cache = HardnessCache(
+            os.environ.get("HINTLWE_CACHE_DIR", DEFAULT_CACHE_DIR),
+            int(max_bytes) if max_bytes else None,
+        )
+    return _default_cache
@@ -0,0 +1,88 @@
+# an approximate mode for dense sweeps over the target security level.
+# for a fixed parameter row (logn, logq, sigma_e), the LWE hardness is a smooth function of the secret stddev. We evaluate it exactly on
+# a sparse grid in log2(secret stddev) for each row, giving a surface over (logn, log sigma_s), and answer queries by linear interpolation.
+# the estimator is only called again when an interpolated value is within the error estimate of the decision boundary the caller cares about.
+# the error estimate is a heuristic, not a bound: it assumes the hardness is smooth in log2(secret stddev), which may fail near the points
+# where the cheapest attack changes. Decisions taken from interpolated values inherit this assumption.
+import math
+from bisect import bisect_right
+from utils import HE_standard_LWE_hardness, HE_standard_LWE_hardness_batch
+
+def _interpolate(xs, ys, x):
+    i = min(max(bisect_right(xs, x), 1), len(xs) - 1)
+    x0, x1, y0, y1 = xs[i - 1], xs[i], ys[i - 1], ys[i]
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+class HardnessSurface:
+    # parameters: a list of rows (logn, logq, sigma_s, sigma_e). sigma_s is ignored, since it is the secret stddev we vary
+    # log_sigma_min, log_sigma_max: the range of log2(secret stddev) covered by the surface
+    # points: the number of exact estimator calls per row. This should be odd, see below
+    # margin: a floor on the error estimate, in bits
+    def __init__(self, parameters, log_sigma_min=-1, log_sigma_max=2, points=17, margin=0.05, hardness=HE_standard_LWE_hardness):
+        assert points >= 5 and points % 2 == 1
+        self.hardness = hardness
+        self.log_sigma_min = log_sigma_min
+        self.log_sigma_max = log_sigma_max
+        self.curves = {}
+        self.error_estimates = {}
+        self.exact_calls = 0
+        self.interpolated_calls = 0
+        xs = [log_sigma_min + (log_sigma_max - log_sigma_min) * i / (points - 1) for i in range(points)]
+        if hardness is HE_standard_LWE_hardness:
+            # the whole grid in one batch, which builds the LWE parameters of each row once
+            queries = [(logn, logq, 2 ** x, sigma_e) for (logn, logq, _, sigma_e) in parameters for x in xs]
+            min_costs = HE_standard_LWE_hardness_batch(queries).min_costs.reshape(len(parameters), points)
+            grid = [row.tolist() for row in min_costs]
+        else:
+            grid = [[float(hardness(logn, logq, 2 ** x, sigma_e)) for x in xs] for (logn, logq, _, sigma_e) in parameters]
+        for (logn, logq, _, sigma_e), ys in zip(parameters, grid):
+            if not all(math.isfinite(y) for y in ys):
+                # no attack finished at some grid point, and interpolating through it would be meaningless
+                raise ValueError(f"no hardness estimate for some secret stddevs of {(logn, logq, sigma_e)}: {dict(zip(xs, ys))}")
+            # the error of interpolating from every other grid point, measured at the points left out. For a smooth curve the error on
+            # the full grid is about a quarter of this, but a kink where the cheapest attack changes need not shrink with the spacing,
+            # so we take all of it
+            coarse_error = max(abs(_interpolate(xs[::2], ys[::2], x) - y) for x, y in zip(xs[1::2], ys[1::2]))
+            self.curves[(logn, logq, sigma_e)] = (xs, ys)
+            self.error_estimates[(logn, logq, sigma_e)] = max(coarse_error, margin)
+
+    def covers(self, logn, logq, secret_sigma, sigma_e):
+        return (logn, logq, sigma_e) in self.curves and self.log_sigma_min <= math.log2(float(secret_sigma)) <= self.log_sigma_max
+
+    # the interpolated hardness in bits, and an estimate of its error
+    def interpolate(self, logn, logq, secret_sigma, sigma_e):
+        xs, ys = self.curves[(logn, logq, sigma_e)]
+        return _interpolate(xs, ys, math.log2(float(secret_sigma))), self.error_estimates[(logn, logq, sigma_e)]
+
+    # the hardness in bits, good enough to compare against `threshold`: interpolated when this is unambiguous,
+    # and exact when the interpolated value is within the error estimate of the threshold or the query lies outside the surface
+    def hardness_near(self, logn, logq, secret_sigma, sigma_e, threshold):
+        if self.covers(logn, logq, secret_sigma, sigma_e):
+            kappa, error_estimate = self.interpolate(logn, logq, secret_sigma, sigma_e)
+            if abs(kappa - threshold) > error_estimate:
+                self.interpolated_calls += 1
+                return kappa
+        self.exact_calls += 1
+        return self.hardness(logn, logq, secret_sigma, sigma_e)
+
+if __name__ == "__main__":
+    # a dense sweep over the target security level, for Fig 2.a. and 2.b.
+    from hintLWE_security import hint_lwe_decision_normalised_noise_flooding, hint_lwe_search_normalised_noise_flooding
+
+    parameters = [
+        (10, 28, 3.19, 3.19),
+        (11, 55, 3.19, 3.19),
+        (12, 108, 3.19, 3.19),
+        (13, 216, 3.19, 3.19),
+        (14, 432, 3.19, 3.19),
+        (15, 870, 3.19, 3.19),
+        (16, 1749, 3.19, 3.19),
+        (17, 3525, 3.19, 3.19)
+    ]
+    surface = HardnessSurface(parameters)
+    print(f"# error estimates: {surface.error_estimates}")
+    for security_level in range(60, 129):
+        decision_normalised_noise_flooding_stddev = hint_lwe_decision_normalised_noise_flooding(parameters, security_level, surface=surface)
+        search_normalised_noise_flooding_stddev = hint_lwe_search_normalised_noise_flooding(parameters, security_level, surface=surface)
+        print(f"{security_level=}:\t{decision_normalised_noise_flooding_stddev=}\t{search_normalised_noise_flooding_stddev=}")
+    print(f"# {surface.exact_calls} exact and {surface.interpolated_calls} interpolated hardness queries")
@@ -5,123 +5,255 @@
 import math
 from utils import *
 from sage.all import pi, sqrt, floor
+from executor import map_rows
+from search import bisect_largest, bracket_largest
+from warm_start import WarmStart
+import sweep
+import instrumentation
 
 # this function returns the bit security of a set of parameters
-def original_bit_security_levels(parameters):
-    security_levels = []
-    for (logn, logq, sigma_s, sigma_e) in parameters:
-        security_level = HE_standard_LWE_hardness(logn, logq, sigma_s, sigma_e)
-        security_levels.append((logn,security_level))
-    return security_levels
+# workers: the number of processes over which to spread the parameter rows, see executor.py
+@instrumentation.timed_function
+def original_bit_security_levels(parameters, workers=1):
+    security_levels = map_rows(HE_standard_LWE_hardness, parameters, workers, progress=workers > 1, label="original_bit_security_levels")
+    return [(logn, security_level) for (logn, _, _, _), security_level in zip(parameters, security_levels)]
+
+# this is the variance of the secret after hints, from Corollary 1.
+# Note that we have a circular dependence between the security level and the secret variance
+def decision_sigma_prime(logn, kappa_prime):
+    return (log(4) + logn * log(2) + log(2 ** ((kappa_prime + 2) / 2) + 1)) / pi ** 2
+
+# this is the variance of the secret after hints, from Corollary 2
+def search_sigma_prime(logn, l):
+    return (log(4) + logn * log(2) - log(1 - 2 ** (-l / 2))) / pi ** 2
+
+# the limit of search_sigma_prime(logn, l) as l grows, the lowest secret variance the search reduction can use
+def search_lowest_sigma_prime(logn):
+    return (log(4) + logn * log(2)) / pi ** 2
+
+# the tightest HintLWE (Decision) reduction for a single parameter row: returns (kappa_prime, normalised flooding stddev in bits), or None.
+# warm_start: start each hardness query from the optimal attack parameters of the previous one, see warm_start.py
+@instrumentation.timed_function
+def decision_security_level(parameters, original_kappa, search="linear", warm_start=False):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    sigma_prime = decision_sigma_prime
+    warm_start = WarmStart() if warm_start else None
+    # we're looking for a kappa_prime such that sigma_prime(kappa_prime) < sigma_s ** 2 / 2 
+    # AND LWE with secret of width sigma_prime is kappa bit secure, with kappa_prime <= kappa - 4
+    def reduction_holds(kappa_prime):
+        instrumentation.count("decision_security_level:kappa_prime_iterations")
+        sigma_prime_ = sigma_prime(logn, kappa_prime)
+        # secret is not wide enough to accomodate reduction to this kappa_prime
+        if sigma_prime_.n() >= sigma_s ** 2 / 2:
+            return False
+        # now we check if this LWE instance is kappa bit secure with kappa_prime <= kappa - 4: this stops at the first attack below the threshold
+        return HE_standard_LWE_is_hard(logn, logq, sigma_prime_, sigma_e, kappa_prime + 4, warm_start=warm_start)
+    
+    highest_kappa_prime = floor(original_kappa) - 1
+    if search == "linear":
+        kappa_prime = next((k for k in reversed(range(highest_kappa_prime + 1)) if reduction_holds(k)), -1)
+    elif search == "bisect":
+        # the width condition is closed form, so we first find the largest kappa_prime it allows without calling the estimator
+        widest_kappa_prime = bisect_largest(0, highest_kappa_prime, lambda k: sigma_prime(logn, k).n() < sigma_s ** 2 / 2)
+        evaluations = []
+        def counted_reduction_holds(k):
+            evaluations.append(k)
+            return reduction_holds(k)
+        kappa_prime = bracket_largest(0, widest_kappa_prime, counted_reduction_holds)
+        # the linear scan calls the estimator for every kappa_prime from the top down to the answer whose secret is wide enough
+        linear_evaluations = sum(1 for k in range(max(kappa_prime, 0), highest_kappa_prime + 1) if sigma_prime(logn, k).n() < sigma_s ** 2 / 2)
+        instrumentation.count("bisect_evaluations", len(evaluations))
+        instrumentation.count("bisect_saved_evaluations", linear_evaluations - len(evaluations))
+    else:
+        raise ValueError(f"unknown search {search}: use 'linear' or 'bisect'")
+    
+    if kappa_prime < 0:
+        print(f"parameters {parameters} do not accomodate reduction from LWE: try increasing sigma_s")
+        return None
+    sigma_prime_ = sigma_prime(logn, kappa_prime)
+    flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
+    return kappa_prime, 0.5 * log(flooding_var, 2).n()
 
 # the security of HintLWE (Decision) via the reduction from LWE of Corollary 1.
-# we report the security of the tightest possible reduction
-def hint_lwe_decision_security_levels(parameters, original_security):
+# we report the security of the tightest possible reduction.
+# search: "linear" scans kappa_prime down from the original security level, "bisect" finds the same kappa_prime by bracketing and bisection,
+# since both sigma_prime and the LWE hardness are monotone in kappa_prime
+# warm_start: warm-start consecutive hardness queries for each parameter row, see warm_start.py
+@instrumentation.timed_function
+def hint_lwe_decision_security_levels(parameters, original_security, search="linear", workers=1, warm_start=False):
     # store the derived security level
     kappa_primes = []
     # store the normalised flooding standard deviation in bits
     normalised_flooding_stddevs = []
     
-    # this is the variance of the secret after hints, from Corollary 1.
-    # Note that we have a circular dependence between the security level and the secret variance
-    sigma_prime = lambda logn, kappa_prime: (log(4) + logn * log(2) + log(2 ** ((kappa_prime + 2) / 2) + 1)) / pi ** 2
-    
-    for (logn, logq, sigma_s, sigma_e), (_, original_kappa) in zip(parameters, original_security):
-        found_reduction = False
-        # we're looking for a kappa_prime such that sigma_prime(kappa_prime) < sigma_s ** 2 / 2 
-        # AND LWE with secret of width sigma_prime is kappa bit secure, with kappa_prime <= kappa - 4
-        for kappa_prime in reversed(range(floor(original_kappa))):
-            sigma_prime_ = sigma_prime(logn, kappa_prime)
-            # secret is not wide enough to accomodate reduction to this kappa_prime
-            foo = sigma_s ** 2 / 2
-            if sigma_prime_.n() >= sigma_s ** 2 / 2:
-                continue
-            # now we check if this LWE instance is kappa bit secure
-            kappa = HE_standard_LWE_hardness(logn, logq, sigma_prime_, sigma_e)
-            if kappa_prime > kappa - 4:
-                continue
-            
-            kappa_primes.append((logn, kappa_prime))
-            flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
-            normalised_flooding_stddevs.append((logn, 0.5 * log(flooding_var, 2).n()))
-            found_reduction = True
-            break
-        if not found_reduction:
-            print(f"parameters {(logn, logq, sigma_s, sigma_e)} do not accomodate reduction from LWE: try increasing sigma_s")
+    rows = [(row, original_kappa, search, warm_start) for row, (_, original_kappa) in zip(parameters, original_security)]
+    for (logn, _, _, _), result in zip(parameters, map_rows(decision_security_level, rows, workers, progress=workers > 1)):
+        if result is None:
+            continue
+        kappa_prime, normalised_flooding_stddev = result
+        kappa_primes.append((logn, kappa_prime))
+        normalised_flooding_stddevs.append((logn, normalised_flooding_stddev))
     return kappa_primes, normalised_flooding_stddevs
-    
+
+# the tightest HintLWE (Search) reduction for a single parameter row: returns (kappa_prime, normalised flooding stddev in bits), or None
+@instrumentation.timed_function
+def search_security_level(parameters, l_max=128):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    # tightest possible reduction: l = 1
+    for l in range(1, l_max + 1):
+        instrumentation.count("search_security_level:l_iterations")
+        sigma_prime_ = search_sigma_prime(logn, l).n()
+        
+        # check if the original secret is wide enough to accomodate reduction
+        if sigma_prime_ >= sigma_s ** 2 / 2:
+            continue
+        kappa_prime = HE_standard_LWE_hardness(logn, logq, sqrt(sigma_prime_), sigma_e) - l
+        flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
+        return kappa_prime, 0.5 * log(flooding_var, 2).n()
+    print(f"parameters {parameters} do not accomodate reduction from LWE: increase sigma_s or l_max")
+    return None
+
 # the security of HintLWE (Search) via the reduction from LWE of Corollary 2. This corresponds to the red line in Fig 1.b.
 # we report the security of the tightest possible reduction, by searching over 1 to l_max
 # to pipe into later results, we also report sigma' squared
-def hint_lwe_search_security_levels(parameters, l_max=128):
+@instrumentation.timed_function
+def hint_lwe_search_security_levels(parameters, l_max=128, workers=1):
     # store the derived security level
     kappa_primes = []
     # store the normalised flooding standard deviation in bits
     normalised_flooding_stddevs = []
     
-    # this is the variance of the secret after hints, from Corollary 2
-    sigma_prime = lambda logn, l: (log(4) + logn * log(2) - log(1 - 2 ** (-l / 2))) / pi ** 2
-    for (logn, logq, sigma_s, sigma_e) in parameters:
-        found_reduction = False
-        # tightest possible reduction: l = 1
-        for l in range(1, l_max + 1):
-            sigma_prime_ = sigma_prime(logn, l).n()
-            
-            # check if the original secret is wide enough to accomodate reduction
-            if sigma_prime_ >= sigma_s ** 2 / 2:
-                continue
-            kappa_prime = HE_standard_LWE_hardness(logn, logq, sqrt(sigma_prime_), sigma_e) - l
-            kappa_primes.append((logn, kappa_prime))
-            flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
-            normalised_flooding_stddevs.append((logn, 0.5 * log(flooding_var, 2).n()))
-            found_reduction = True
-            break
-        if not found_reduction:
-            print(f"parameters {(logn, logq, sigma_s, sigma_e)} do not accomodate reduction from LWE: increase sigma_s or l_max")
+    rows = [(row, l_max) for row in parameters]
+    for (logn, _, _, _), result in zip(parameters, map_rows(search_security_level, rows, workers, progress=workers > 1)):
+        if result is None:
+            continue
+        kappa_prime, normalised_flooding_stddev = result
+        kappa_primes.append((logn, kappa_prime))
+        normalised_flooding_stddevs.append((logn, normalised_flooding_stddev))
     return kappa_primes, normalised_flooding_stddevs
 
+# the LWE hardness, for comparison against `threshold` (see utils.HE_standard_LWE_threshold_hardness). If a HardnessSurface is given, this is
+# interpolated from the surface unless the interpolated value is too close to the threshold to be conclusive (see hardness_surface.py)
+def hardness_for_threshold(logn, logq, secret_sigma, sigma_e, threshold, surface=None, warm_start=None):
+    if surface is None:
+        return HE_standard_LWE_threshold_hardness(logn, logq, secret_sigma, sigma_e, threshold, warm_start=warm_start)
+    return surface.hardness_near(logn, logq, secret_sigma, sigma_e, threshold)
+
 # how much noise flooding is required for the decision reduction to give that the HintLWE problem with the given parameters is `security level` bit secure.
-def hint_lwe_decision_normalised_noise_flooding(parameters, security_level):
+# surface: an optional HardnessSurface, to answer most hardness queries by interpolation
+@instrumentation.timed_function
+def hint_lwe_decision_normalised_noise_flooding(parameters, security_level, surface=None):
     normalised_flooding_stddevs = []
-    sigma_prime = lambda logn, security_level: (log(4) + logn * log(2) + log(2 ** ((security_level + 2) / 2) + 1)) / pi ** 2
     for (logn, logq, sigma_s, sigma_e) in parameters:
-        sigma_prime_ = sigma_prime(logn, security_level)
-        if sigma_prime_ > 0.5 * sigma_s ** 2:
-            # can't achieve this security level with these parameter levels: continue
-            continue
-        else:
-            # if LWE with secret stddev sigma_prime is kappa bits secure, and security_level <= kappa - 4, done
-            kappa = HE_standard_LWE_hardness(logn, logq, sqrt(sigma_prime_), sigma_e)
-            if security_level <= kappa - 4:
+        hardness = lambda secret_sigma, threshold: hardness_for_threshold(logn, logq, secret_sigma, sigma_e, threshold, surface)
+        normalised_flooding_stddev = decision_normalised_noise_flooding((logn, logq, sigma_s, sigma_e), security_level, hardness)
+        if normalised_flooding_stddev is not None:
+            normalised_flooding_stddevs.append((logn, normalised_flooding_stddev))
+    return normalised_flooding_stddevs
+
+# the normalised flooding stddev in bits for the decision reduction for one parameter row, or None if the reduction does not give `security_level`.
+# hardness(secret_sigma, threshold) is the LWE hardness of this row with the given secret stddev, for comparison against threshold
+def decision_normalised_noise_flooding(parameters, security_level, hardness):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    sigma_prime_ = decision_sigma_prime(logn, security_level)
+    if sigma_prime_ > 0.5 * sigma_s ** 2:
+        # can't achieve this security level with these parameter levels
+        return None
+    # if LWE with secret stddev sigma_prime is kappa bits secure, and security_level <= kappa - 4, done
+    kappa = hardness(sqrt(sigma_prime_), security_level + 4)
+    if security_level > kappa - 4:
+        return None
+    flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
+    return 0.5 * log(flooding_var, 2).n()
+
+# hint_lwe_decision_normalised_noise_flooding for several security levels at once: returns a dict from each security level to its list of (logn, stddev).
+# if the reduction gives some security level, it gives every lower one, so for each parameter row we bisect over the sorted security levels:
+# this takes O(log(len(security_levels))) hardness evaluations per row rather than one per security level
+@instrumentation.timed_function
+def hint_lwe_decision_normalised_noise_flooding_levels(parameters, security_levels):
+    targets = sorted(set(security_levels))
+    normalised_flooding_stddevs = {security_level: [] for security_level in security_levels}
+    for (logn, logq, sigma_s, sigma_e) in parameters:
+        hardness = lambda secret_sigma, threshold: HE_standard_LWE_threshold_hardness(logn, logq, secret_sigma, sigma_e, threshold)
+        stddevs = {}
+        def reduction_holds(i):
+            stddevs[i] = decision_normalised_noise_flooding((logn, logq, sigma_s, sigma_e), targets[i], hardness)
+            return stddevs[i] is not None
+        highest = bisect_largest(0, len(targets) - 1, reduction_holds)
+        for i in range(highest + 1):
+            if i not in stddevs:
+                # the flooding stddev itself is closed form: only the check needs the estimator
+                sigma_prime_ = decision_sigma_prime(logn, targets[i])
                 flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
-                normalised_flooding_stddevs.append((logn, 0.5 * log(flooding_var, 2).n()))
+                stddevs[i] = 0.5 * log(flooding_var, 2).n()
+            normalised_flooding_stddevs[targets[i]].append((logn, stddevs[i]))
     return normalised_flooding_stddevs
-        
-def hint_lwe_search_normalised_noise_flooding(parameters, security_level):
+
+# how much noise flooding is required for the search reduction to give that the HintLWE problem with the given parameters is `security level` bit secure.
+# surface: an optional HardnessSurface, to answer most hardness queries by interpolation
+# warm_start: warm-start the hardness queries of the scan over l for each parameter row, see warm_start.py
+@instrumentation.timed_function
+def hint_lwe_search_normalised_noise_flooding(parameters, security_level, surface=None, warm_start=False):
     normalised_flooding_stddevs = []
-    sigma_prime = lambda logn, l: (log(4) + logn * log(2) - log(1 - 2 ** (-l / 2))) / pi ** 2
     for (logn, logq, sigma_s, sigma_e) in parameters:
-        highest_sigma_prime = sigma_prime(logn, 1)
-        highest_kappa = HE_standard_LWE_hardness(logn, logq, sqrt(highest_sigma_prime), sigma_e)
-        if (security_level + 1 - highest_kappa) > -10 ** (-10):
-            # can't achieve this security level with these parameter levels: continue
-            continue
-        
-        lowest_sigma_prime = (log(4) + logn * log(2)) / pi ** 2
-        if lowest_sigma_prime > 0.5 * sigma_s ** 2:
-            # can't achieve this security level with these parameter levels: continue
+        row_warm_start = WarmStart() if warm_start else None
+        kappa = lambda l, threshold: hardness_for_threshold(logn, logq, sqrt(search_sigma_prime(logn, l)), sigma_e, threshold, surface, row_warm_start)
+        normalised_flooding_stddev = search_normalised_noise_flooding((logn, logq, sigma_s, sigma_e), security_level, kappa)
+        if normalised_flooding_stddev is not None:
+            normalised_flooding_stddevs.append((logn, normalised_flooding_stddev))
+    return normalised_flooding_stddevs
+
+# the normalised flooding stddev in bits for the search reduction for one parameter row, or None if the reduction does not give `security_level`.
+# kappa(l, threshold) is the LWE hardness of this row with secret variance sigma_prime(logn, l), for comparison against threshold
+# lowest_kappa(): the exact LWE hardness of this row with secret variance search_lowest_sigma_prime(logn), if the caller shares it between calls
+def search_normalised_noise_flooding(parameters, security_level, kappa, lowest_kappa=None):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    sigma_prime = search_sigma_prime
+    highest_kappa = kappa(1, security_level + 1)
+    if (security_level + 1 - highest_kappa) > -10 ** (-10):
+        # can't achieve this security level with these parameter levels
+        return None
+    
+    lowest_sigma_prime = search_lowest_sigma_prime(logn)
+    if lowest_sigma_prime > 0.5 * sigma_s ** 2:
+        # can't achieve this security level with these parameter levels
+        return None
+    # the range of l depends on this directly, so it is always evaluated exactly
+    if lowest_kappa is None:
+        lowest_kappa = lambda: HE_standard_LWE_hardness(logn, logq, sqrt(lowest_sigma_prime), sigma_e)
+    for l in reversed(range(1, int(math.ceil(lowest_kappa() - security_level)) + 1)):
+        instrumentation.count("search_normalised_noise_flooding:l_iterations")
+        sigma_prime_ = sigma_prime(logn, l)
+        if sigma_prime_ > 0.5 * sigma_s ** 2:
             continue
-        lowest_kappa = HE_standard_LWE_hardness(logn, logq, sqrt(lowest_sigma_prime), sigma_e)
-        for l in reversed(range(1, int(math.ceil(lowest_kappa - security_level)) + 1)):
-            sigma_prime_ = sigma_prime(logn, l)
-            if sigma_prime_ > 0.5 * sigma_s ** 2:
-                continue
-            kappa = HE_standard_LWE_hardness(logn, logq, sqrt(sigma_prime_), sigma_e)
-            kappa_prime = kappa - l
-            if (kappa_prime - security_level) >= -10 ** (-10):
-                flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
-                normalised_flooding_stddevs.append((logn, 0.5 * log(flooding_var, 2).n()))
-                break
+        kappa_prime = kappa(l, security_level + l) - l
+        if (kappa_prime - security_level) >= -10 ** (-10):
+            flooding_var = 1 / (1 / (2 * sigma_prime_) - 1 / sigma_s ** 2)
+            return 0.5 * log(flooding_var, 2).n()
+    return None
+
+# hint_lwe_search_normalised_noise_flooding for several security levels at once: returns a dict from each security level to its list of (logn, stddev).
+# for each parameter row, the curve of LWE hardness against l is evaluated once, as far as needed, and shared by all the security levels
+# warm_start: warm-start the hardness queries along this curve, see warm_start.py
+@instrumentation.timed_function
+def hint_lwe_search_normalised_noise_flooding_levels(parameters, security_levels, warm_start=False):
+    normalised_flooding_stddevs = {security_level: [] for security_level in security_levels}
+    for (logn, logq, sigma_s, sigma_e) in parameters:
+        row_warm_start = WarmStart() if warm_start else None
+        kappas = {}
+        def kappa(l, threshold):
+            if l not in kappas:
+                kappas[l] = HE_standard_LWE_hardness(logn, logq, sqrt(search_sigma_prime(logn, l)), sigma_e, warm_start=row_warm_start)
+            return kappas[l]
+        # the hardness in the limit of large l, which bounds the range of l for every security level
+        def lowest_kappa():
+            if oo not in kappas:
+                kappas[oo] = HE_standard_LWE_hardness(logn, logq, sqrt(search_lowest_sigma_prime(logn)), sigma_e)
+            return kappas[oo]
+        for security_level in normalised_flooding_stddevs:
+            normalised_flooding_stddev = search_normalised_noise_flooding((logn, logq, sigma_s, sigma_e), security_level, kappa, lowest_kappa)
+            if normalised_flooding_stddev is not None:
+                normalised_flooding_stddevs[security_level].append((logn, normalised_flooding_stddev))
     return normalised_flooding_stddevs
     
 if __name__ == "__main__":
@@ -142,13 +274,19 @@ if __name__ == "__main__":
     ]
     
     # the blue lines in Fig 1.a. and 1.b.
-    original_security_levels = original_bit_security_levels(parameters=parameters)
+    # each parameter row is independent, so we spread them over one process each
+    workers = len(parameters)
+    
+    # these are stored in results/original_security.jsonl, and only computed for rows missing from that file
+    original_security_levels = [(logn, security_level) for (logn, _, _, _), security_level in zip(parameters, sweep.original_security_levels(parameters, workers))]
     print(f"# {original_security_levels=}")
     print()
     
-    original_security_levels=[(10, 131.903812370381), (11, 128.744594166727), (12, 128.934036200343), (13, 128.193639623478), (14, 128.334392294043), (15, 128.078948557141), (16, 128.021734664213), (17, 128.126809683405)]
-    
-    decision_kappa_primes, decision_normalised_flooding_stddevs = hint_lwe_decision_security_levels(parameters, original_security_levels)
+    # the evaluations saved by bisection are only recorded for rows run in this process, i.e. with workers=1
+    with instrumentation.instrument() as recorder:
+        decision_kappa_primes, decision_normalised_flooding_stddevs = hint_lwe_decision_security_levels(parameters, original_security_levels, search="bisect", workers=workers)
+    if "bisect_evaluations" in recorder.counters:
+        print(f"# bisection used {recorder.counters['bisect_evaluations']} hardness evaluations, saving {recorder.counters['bisect_saved_evaluations']} over the linear scan")
     # the red line in Fig 1.a.
     print(f"{decision_kappa_primes=}")
     print(f"{decision_normalised_flooding_stddevs=}")
@@ -156,20 +294,24 @@ if __name__ == "__main__":
     
     decision_normalised_flooding_stddev = hint_lwe_decision_normalised_noise_flooding(parameters, 118)
     print(decision_normalised_flooding_stddev)
-    search_kappa_primes, search_normalised_flooding_stddevs = hint_lwe_search_security_levels(parameters)
+    search_kappa_primes, search_normalised_flooding_stddevs = hint_lwe_search_security_levels(parameters, workers=workers)
     # the red line in Fig 1.b.
     print(f"{search_kappa_primes=}")
     print(f"{search_normalised_flooding_stddevs=}")
     print()
     
     # # data for Fig 2.a. and 2.b.
-    for security_level in [120, 100, 80]:
-        decision_normalised_noise_flooding_stddev = hint_lwe_decision_normalised_noise_flooding(parameters, security_level)
+    # all the security levels share the hardness evaluations for each parameter row
+    security_levels = [120, 100, 80]
+    decision_normalised_noise_flooding_stddevs = hint_lwe_decision_normalised_noise_flooding_levels(parameters, security_levels)
+    for security_level in security_levels:
+        decision_normalised_noise_flooding_stddev = decision_normalised_noise_flooding_stddevs[security_level]
         print(f"{security_level=}:\t{decision_normalised_noise_flooding_stddev=}")
     print()
     
-    for security_level in [120, 100, 80]:
-        search_normalised_noise_flooding_stddev = hint_lwe_search_normalised_noise_flooding(parameters, security_level)
+    search_normalised_noise_flooding_stddevs = hint_lwe_search_normalised_noise_flooding_levels(parameters, security_levels)
+    for security_level in security_levels:
+        search_normalised_noise_flooding_stddev = search_normalised_noise_flooding_stddevs[security_level]
         print(f"{security_level=}:\t{search_normalised_noise_flooding_stddev=}")
     
     
@@ -1,83 +1,111 @@
 # this code corresponds to section 6.2
-from sage.all import log, pi, sqrt
-from hintLWE_security import hint_lwe_decision_normalised_noise_flooding
+# the closed-form noise formulas here only use floats: sage and the lattice estimator are imported lazily, when we need the HintLWE reduction
+import math
+from executor import map_rows
+import sweep
+import instrumentation
 
 # this is the required flooding noise from the prior art as a function of a total noise bound E, number of decryptions, and a target security level
 def prior_flooding_noise(t, logE, target_security):
-    total_flooding_noise = logE + target_security / 2 + 0.5 * log(64 * t, 2)
+    total_flooding_noise = logE + target_security / 2 + 0.5 * math.log2(64 * t)
     return total_flooding_noise
 
 # this is the required flooding noise from our Theorem 3
 def bit_security_flooding_noise(logE, target_security):
-    total_flooding_noise = logE + target_security / 2 + 0.5 * log(4, 2)
+    total_flooding_noise = logE + target_security / 2 + 0.5 * math.log2(4)
     return total_flooding_noise
 
 # our flooding noise is linear in |[A]_q/q|_2, or in the ring setting, |[a]_q / q|^can_2. We take a worst case bound on this value
 def worst_case_ATA(n):
-    return (2 * n / pi) ** 2 + 1
+    return (2 * n / math.pi) ** 2 + 1
 
 # this is the amount of required noise to use a HintLWE reduction when the original secret width is sigma, the secret width after hints in sigma_prime.
 # t: the number of allowed decryptions
 # ATA_bound: a bound on the hint matrix |[A]_q / q|_2^2  
 def sigma_i(t, ATA_bound, log_normalised_flooding_stddev):
-    sigma_i_ = 0.5 * log(t, 2) + 0.5 * log(ATA_bound, 2) + log_normalised_flooding_stddev
+    sigma_i_ = 0.5 * math.log2(t) + 0.5 * math.log2(ATA_bound) + log_normalised_flooding_stddev
     return sigma_i_
 
-def hint_lwe_flooding_noise(t, rescaled_noise_bound, target_security, n, log_normalised_flooding_stddev):
-    ATA_bound = worst_case_ATA(n)
+# since our results are in terms of |error|_2, we convert this to addition precision loss via sqrt(n) * sigma / |error|_2
+def additional_precision_loss(logn, log_sigma, log_total_noise):
+    return logn / 2 + log_sigma - log_total_noise
+
+def hint_lwe_flooding_noise(t, rescaled_noise_bound, target_security, n, log_normalised_flooding_stddev, ATA_bound=None):
+    ATA_bound = ATA_bound or worst_case_ATA(n)
     sigma_i_ = sigma_i(t, ATA_bound, log_normalised_flooding_stddev)
     rescaled_noise_flooding = bit_security_flooding_noise(rescaled_noise_bound, target_security)
     return max(rescaled_noise_flooding, sigma_i_)
 
-def flooding_noise_levels(parameters, t, original_security, target_security, max_rescaled_noise_magnitude=40):
+# the normalised flooding stddev of HintLWE (Decision) needed for `target_security` bits of IND-CPA-D security, or None if the reduction can't give it.
+# this is the only step needing the lattice estimator
+def hint_lwe_normalised_flooding_stddev(parameters, target_security):
+    # this is the security we target for HintLWE (Decision)
+    kappa_prime = target_security + 4 + math.log2(12)
+    from hintLWE_security import hint_lwe_decision_normalised_noise_flooding
+    normalised_flooding_stddevs = hint_lwe_decision_normalised_noise_flooding([parameters], kappa_prime)
+    if not normalised_flooding_stddevs:
+        print(f"cannot achieve {target_security=} via reduction: try increasing secret variance or decreasing target security")
+        return None
+    [(_, log_normalised_flooding_stddev)] = normalised_flooding_stddevs
+    return float(log_normalised_flooding_stddev)
+
+@instrumentation.timed_function
+def flooding_noise_levels(parameters, t, original_security, target_security, max_rescaled_noise_magnitude=40, ATA_bound=None):
+    log_normalised_flooding_stddev = hint_lwe_normalised_flooding_stddev(parameters, target_security)
+    return flooding_noise_curves(parameters, t, original_security, target_security, log_normalised_flooding_stddev, max_rescaled_noise_magnitude, ATA_bound)
+
+# flooding_noise_levels given the normalised HintLWE flooding stddev (None if the reduction can't give target_security). This is closed form.
+# ATA_bound: a bound on |[A]_q / q|_2^2, by default worst_case_ATA(n). See canonical_norm.py for a heuristic estimate, which is not a bound
+def flooding_noise_curves(parameters, t, original_security, target_security, log_normalised_flooding_stddev, max_rescaled_noise_magnitude=40, ATA_bound=None):
     (logn, logq, sigma_s, sigma_e) = parameters
     n = 2 ** logn
+    ATA_bound = ATA_bound or worst_case_ATA(n)
     
     absolute_noise = {"prior": [], "bit_security": [], "hint_lwe": []}
     
     additional_noise = {"prior": [], "bit_security": [], "hint_lwe": []}
     
     # a (2 norm) bound on the noise due to rescaling, ([A]_q * s - [b]_q ) / q
-    rescaling_noise = (sqrt(worst_case_ATA(n)) * sqrt(n) * sigma_s + 0.5).n()
+    rescaling_noise = math.sqrt(ATA_bound) * math.sqrt(n) * sigma_s + 0.5
     
-    cross_over_point = log(rescaling_noise, 2).n()
+    cross_over_point = math.log2(rescaling_noise)
     
-    # this is the security we target for HintLWE (Decision)
-    kappa_prime = target_security + 4 + log(12, 2).n()
-    try:
-        [(_, log_normalised_flooding_stddev)] = hint_lwe_decision_normalised_noise_flooding([parameters], kappa_prime)
-    except:
-        ValueError(f"cannot achieve {target_security=} via reduction: try increasing secret variance or decreasing target security")
+    if log_normalised_flooding_stddev is None:
         return cross_over_point, absolute_noise, additional_noise
-        
-    # since our results are in terms of |error|_2, we convert this to addition precision loss via sqrt(n) * sigma / |error|_2
-    additional_precision_loss = lambda logn, log_sigma, log_total_noise: (logn / 2 + log_sigma - log_total_noise).n()
     
     for rescaled_noise_magnitude in range(1, max_rescaled_noise_magnitude + 1):
         # first we calculate a bound on the total noise from the bound on the rescaled noise magnitude
         total_noise = 2 ** rescaled_noise_magnitude + rescaling_noise
-        log_total_noise = log(total_noise, 2)
+        log_total_noise = math.log2(total_noise)
         
         # prior result requires gap between IND-CPA and IND-CPA-D security at least 8
         if original_security - target_security >= 8:            
             prior_flooding_noise_ = prior_flooding_noise(t, log_total_noise, target_security)
-            absolute_noise["prior"].append((rescaled_noise_magnitude, prior_flooding_noise_.n()))
+            absolute_noise["prior"].append((rescaled_noise_magnitude, prior_flooding_noise_))
             prior_precision_loss = additional_precision_loss(logn, prior_flooding_noise_, log_total_noise)
             additional_noise["prior"].append((rescaled_noise_magnitude, prior_precision_loss))
         
         # our bit security result requires a gap between IND-CPA and IND-CPA-D security at least 4
         if original_security - target_security >= 4:
             bit_security_flooding_noise_ = bit_security_flooding_noise(log_total_noise, target_security)
-            absolute_noise["bit_security"].append((rescaled_noise_magnitude, bit_security_flooding_noise_.n()))
+            absolute_noise["bit_security"].append((rescaled_noise_magnitude, bit_security_flooding_noise_))
             bit_security_precision_loss = additional_precision_loss(logn, bit_security_flooding_noise_, log_total_noise)
             additional_noise["bit_security"].append((rescaled_noise_magnitude, bit_security_precision_loss))
 
-        hint_lwe_flooding_noise_ = hint_lwe_flooding_noise(t, rescaled_noise_magnitude, target_security, n, log_normalised_flooding_stddev)
+        hint_lwe_flooding_noise_ = hint_lwe_flooding_noise(t, rescaled_noise_magnitude, target_security, n, log_normalised_flooding_stddev, ATA_bound)
         absolute_noise["hint_lwe"].append((rescaled_noise_magnitude, hint_lwe_flooding_noise_))
         hint_lwe_precision_loss = additional_precision_loss(logn, hint_lwe_flooding_noise_, log_total_noise)
         additional_noise["hint_lwe"].append((rescaled_noise_magnitude, hint_lwe_precision_loss))
         
     return cross_over_point, absolute_noise, additional_noise
+
+# flooding_noise_levels for several parameter sets, each with its own original security level, returned in input order.
+# workers: the number of processes over which to spread the parameter sets, see executor.py
+# ATA_bounds: an optional bound on |[A]_q / q|_2^2 for each parameter set, see flooding_noise_curves
+def flooding_noise_levels_table(parameter_sets, t, original_security_levels, target_security, max_rescaled_noise_magnitude=40, workers=1, ATA_bounds=None):
+    ATA_bounds = ATA_bounds or [None] * len(parameter_sets)
+    rows = [(parameters, t, original_security, target_security, max_rescaled_noise_magnitude, ATA_bound) for parameters, original_security, ATA_bound in zip(parameter_sets, original_security_levels, ATA_bounds)]
+    return map_rows(flooding_noise_levels, rows, workers, progress=workers > 1)
     
 if __name__ == "__main__":
     # this script generates the data for Fig 3
@@ -90,16 +118,12 @@ if __name__ == "__main__":
         (14, 432, 3.19, 3.19),
         (16, 1749, 3.19, 3.19)
         ]
-    original_security_levels = [
-        131.903812370381,
-        128.934036200343,
-        128.334392294043,
-        128.021734664213
-    ]
+    # the original security levels are read from results/original_security.jsonl (see sweep.py), computing any that are missing
+    original_security_levels = sweep.original_security_levels(parameter_sets)
     
-    for parameters, original_security in zip(parameter_sets, original_security_levels):
+    table = flooding_noise_levels_table(parameter_sets, t, original_security_levels, target_security, workers=len(parameter_sets))
+    for parameters, (cross_over_point, absolute_noise, additional_noise) in zip(parameter_sets, table):
         print(f"# {parameters=}")
-        cross_over_point, absolute_noise, additional_noise = flooding_noise_levels(parameters, t, original_security, target_security)
         print(f"# cross over point (rescaling noise = rescaled noise) at {cross_over_point}")
         
         print("# absolute noise:")
@@ -0,0 +1,109 @@
+# opt-in instrumentation of the hot paths: hardness queries, individual attacks, cache lookups and the outer search loops.
+# nothing is recorded unless an `instrument()` context is active, e.g.
+#     with instrument() as recorder:
+#         hint_lwe_decision_security_levels(parameters, original_security_levels)
+#     recorder.dump("report.json")
+#     print(recorder.flame_summary())
+# only the current process is recorded: work sent to other processes (parallel=True, budgets, workers > 1) shows up as the time the
+# caller spent waiting for it.
+import json
+import time
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+
+class Recorder:
+    def __init__(self):
+        self.counters = {}
+        # name -> [calls, total seconds, longest call]
+        self.timers = {}
+        # the nesting of timers, as ";"-joined paths -> [calls, total seconds]
+        self.stacks = {}
+        self._stack = []
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name, seconds, path=None):
+        calls, total, longest = self.timers.get(name, (0, 0.0, 0.0))
+        self.timers[name] = [calls + 1, total + seconds, max(longest, seconds)]
+        path = path or ";".join(self._stack + [name])
+        calls, total = self.stacks.get(path, (0, 0.0))
+        self.stacks[path] = [calls + 1, total + seconds]
+
+    @contextmanager
+    def timed(self, name):
+        self._stack.append(name)
+        path = ";".join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self.record(name, time.perf_counter() - start, path)
+
+    def report(self):
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": {name: {"calls": calls, "total": total, "max": longest} for name, (calls, total, longest) in sorted(self.timers.items())},
+            "stacks": {path: {"calls": calls, "total": total} for path, (calls, total) in sorted(self.stacks.items())},
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    # the time spent in each stack excluding the stacks nested in it, in the "collapsed stack" format read by flamegraph tools
+    def collapsed_stacks(self):
+        self_times = {path: total for path, (_, total) in self.stacks.items()}
+        for path, (_, total) in self.stacks.items():
+            parent = path.rpartition(";")[0]
+            if parent in self_times:
+                self_times[parent] -= total
+        return "\n".join(f"{path} {max(round(seconds * 1e6), 0)}" for path, seconds in sorted(self_times.items()))
+
+    # a human readable tree of the timers, with the counters
+    def flame_summary(self):
+        lines = []
+        for path, (calls, total) in sorted(self.stacks.items()):
+            depth = path.count(";")
+            lines.append(f"{'  ' * depth}{path.rpartition(';')[2]}: {total:.3f}s over {calls} calls")
+        lines += [f"{name} = {value}" for name, value in sorted(self.counters.items())]
+        return "\n".join(lines)
+
+_recorders = []
+
+# record counters and timers while this context is active
+@contextmanager
+def instrument():
+    recorder = Recorder()
+    _recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorders.remove(recorder)
+
+def active():
+    return bool(_recorders)
+
+def count(name, n=1):
+    for recorder in _recorders:
+        recorder.count(name, n)
+
+def record(name, seconds):
+    for recorder in _recorders:
+        recorder.record(name, seconds)
+
+@contextmanager
+def timed(name):
+    with ExitStack() as stack:
+        for recorder in list(_recorders):
+            stack.enter_context(recorder.timed(name))
+        yield
+
+# a decorator timing every call of a function under its name
+def timed_function(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with timed(function.__name__):
+            return function(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,81 @@
+# inverse queries on the flooding noise of Figs 3 and 4: starting from a noise budget, i.e. the number of bits of precision we can
+# give up (the "additional noise" of flooding_noise_levels), find
+#   - the largest number of decryptions t that the budget supports, for a fixed target security, or
+#   - the largest target security that the budget supports, for a fixed t.
+# the additional noise only grows with t and with the target security, so both are monotone searches: galloping then bisection over
+# t, and bisection over the target security. The closed-form noise is cheap; the HintLWE flooding stddev needs the lattice estimator,
+# but only depends on the target security, and is stored under results/ (see sweep.py) so that later queries reuse it.
+import math
+import instrumentation
+import ind_cpa_d_security
+import kr_d_security
+import pipeline
+from search import bisect_largest, gallop_largest
+from sweep import run_sweep, results_path
+
+SECURITY_NOTIONS = {
+    "ind_cpa_d": (ind_cpa_d_security, pipeline.ind_cpa_d_flooding_stddev),
+    "kr_d": (kr_d_security, pipeline.kr_d_flooding_stddev),
+}
+
+# the smallest gap in bits between the original and target security at which each method's noise bound applies, by notion. The IND-CPA-D
+# bounds are those of ind_cpa_d_security.flooding_noise_curves; every KR-D curve uses kr_d_security.bit_security_flooding_noise, which
+# needs a gap of at least 1
+SECURITY_GAPS = {
+    "ind_cpa_d": {"prior": 8, "bit_security": 4, "hint_lwe": 0},
+    "kr_d": {"bit_security": 1, "hint_lwe": 1},
+}
+
+# the largest integer target security, strictly below the original security, at which `method` applies
+def highest_target_security(notion, original_security, method):
+    return min(math.ceil(original_security) - 1, math.floor(original_security - SECURITY_GAPS[notion][method]))
+
+# the normalised HintLWE flooding stddev for `target_security` bits of the security notion ("ind_cpa_d" or "kr_d"), or None
+def normalised_flooding_stddev(notion, parameters, target_security):
+    _, stage = SECURITY_NOTIONS[notion]
+    [stddev] = run_sweep(stage, [(list(parameters), target_security)], results_path(f"{notion}_flooding_stddev"), progress=False)
+    return stddev
+
+# the additional noise in bits of `method` at a rescaled noise magnitude, or None if the method does not apply
+# (e.g. the gap between the original and target security is too small, or the HintLWE reduction can't give the target security)
+def additional_noise(notion, parameters, t, original_security, target_security, rescaled_noise_magnitude, method="hint_lwe", ATA_bound=None):
+    instrumentation.count("inverse_query_evaluations")
+    security, _ = SECURITY_NOTIONS[notion]
+    stddev = normalised_flooding_stddev(notion, parameters, target_security) if method == "hint_lwe" else 0.0
+    if stddev is None:
+        return None
+    _, _, noise = security.flooding_noise_curves(parameters, t, original_security, target_security, stddev, rescaled_noise_magnitude, ATA_bound)
+    if not noise[method]:
+        return None
+    return noise[method][-1][1]
+
+def _within_budget(noise, noise_budget):
+    return noise is not None and noise <= noise_budget
+
+# the largest number of decryptions t <= t_max for which `method` costs at most noise_budget bits of additional noise at the given
+# rescaled noise magnitude, or 0 if even a single decryption exceeds the budget or the method does not apply at this target security
+def max_decryptions(notion, parameters, original_security, target_security, rescaled_noise_magnitude, noise_budget, method="hint_lwe", t_max=2 ** 64, ATA_bound=None):
+    if target_security > highest_target_security(notion, original_security, method):
+        return 0
+    def within_budget(t):
+        return _within_budget(additional_noise(notion, parameters, t, original_security, target_security, rescaled_noise_magnitude, method, ATA_bound), noise_budget)
+    return gallop_largest(1, t_max, within_budget)
+
+# the largest integer target security for which `method` costs at most noise_budget bits of additional noise with t decryptions at
+# the given rescaled noise magnitude, or None if no target security from `lowest` up does
+def max_target_security(notion, parameters, t, original_security, rescaled_noise_magnitude, noise_budget, method="hint_lwe", lowest=1, ATA_bound=None):
+    def within_budget(target_security):
+        return _within_budget(additional_noise(notion, parameters, t, original_security, target_security, rescaled_noise_magnitude, method, ATA_bound), noise_budget)
+    target_security = bisect_largest(lowest, highest_target_security(notion, original_security, method), within_budget)
+    return target_security if target_security >= lowest else None
+
+if __name__ == "__main__":
+    # e.g. at a rescaled noise of 2^20, how many decryptions can the prior art afford with 55 bits of precision, and how much
+    # IND-CPA-D security can HintLWE give with 10 bits?
+    parameters, original_security = (14, 432, 3.19, 3.19), 128.334392294043
+    with instrumentation.instrument() as recorder:
+        t = max_decryptions("ind_cpa_d", parameters, original_security, 80, 20, 55, method="prior")
+    print(f"# prior: at most {t=} decryptions for 80 bits of IND-CPA-D security, in {recorder.counters['inverse_query_evaluations']} evaluations")
+    with instrumentation.instrument() as recorder:
+        target_security = max_target_security("ind_cpa_d", parameters, 2 ** 6, original_security, 20, 10)
+    print(f"# hint_lwe: at most {target_security=} bits of IND-CPA-D security for t = 2^6, in {recorder.counters['inverse_query_evaluations']} evaluations")
@@ -1,67 +1,93 @@
 # this code corresponds to Section 6.3
-from sage.all import log, e, sqrt
-from ind_cpa_d_security import worst_case_ATA, sigma_i
-from hintLWE_security import hint_lwe_search_normalised_noise_flooding
+# as in ind_cpa_d_security, the closed-form noise formulas only use floats, and the lattice estimator is imported lazily
+import math
+from ind_cpa_d_security import worst_case_ATA, sigma_i, additional_precision_loss
+from executor import map_rows
+import sweep
+import instrumentation
 
 def bit_security_flooding_noise(t, logE, original_security, target_security):
     l = original_security - target_security
     assert(l >= 1)
     loss = original_security - target_security
-    total_flooding_noise = log(2 * original_security * t * log(e, 2), 2) / 2 + logE - log(l, 2)
-    return total_flooding_noise.n()
+    total_flooding_noise = math.log2(2 * original_security * t * math.log2(math.e)) / 2 + logE - math.log2(l)
+    return total_flooding_noise
 
 
-def hint_lwe_flooding_noise(t, rescaled_noise_bound, hintlwe_security, target_security, n, log_normalised_flooding_stddev):
-    ATA_bound = worst_case_ATA(n)
+def hint_lwe_flooding_noise(t, rescaled_noise_bound, hintlwe_security, target_security, n, log_normalised_flooding_stddev, ATA_bound=None):
+    ATA_bound = ATA_bound or worst_case_ATA(n)
     sigma_i_ = sigma_i(t, ATA_bound, log_normalised_flooding_stddev)
     
     rescaled_noise_flooding = bit_security_flooding_noise(t, rescaled_noise_bound, hintlwe_security, target_security)
     
     return max(rescaled_noise_flooding, sigma_i_)
 
-def flooding_noise_levels(parameters, t, original_security, target_security, max_rescaled_noise_magnitude=40):
+# the normalised flooding stddev of HintLWE (Search) needed for `target_security` bits of KR-D security, or None if the reduction can't give it.
+# this is the only step needing the lattice estimator
+def hint_lwe_normalised_flooding_stddev(parameters, target_security):
+    # this is the security we target for HintLWE (Search)
+    kappa_prime = target_security + 1
+    print(f"targetting hintLWE security = {kappa_prime}")
+    from hintLWE_security import hint_lwe_search_normalised_noise_flooding
+    normalised_flooding_stddevs = hint_lwe_search_normalised_noise_flooding([parameters], kappa_prime)
+    if not normalised_flooding_stddevs:
+        print(f"cannot achieve {target_security=} via reduction: try increasing secret variance or decreasing target security")
+        return None
+    [(_, log_normalised_flooding_stddev)] = normalised_flooding_stddevs
+    return float(log_normalised_flooding_stddev)
+
+@instrumentation.timed_function
+def flooding_noise_levels(parameters, t, original_security, target_security, max_rescaled_noise_magnitude=40, ATA_bound=None):
+    log_normalised_flooding_stddev = hint_lwe_normalised_flooding_stddev(parameters, target_security)
+    return flooding_noise_curves(parameters, t, original_security, target_security, log_normalised_flooding_stddev, max_rescaled_noise_magnitude, ATA_bound)
+
+# flooding_noise_levels given the normalised HintLWE flooding stddev (None if the reduction can't give target_security). This is closed form.
+# ATA_bound: a bound on |[A]_q / q|_2^2, by default worst_case_ATA(n). See canonical_norm.py for a heuristic estimate, which is not a bound
+def flooding_noise_curves(parameters, t, original_security, target_security, log_normalised_flooding_stddev, max_rescaled_noise_magnitude=40, ATA_bound=None):
     (logn, logq, sigma_s, sigma_e) = parameters
     n = 2 ** logn
-    
-    # since our results are in terms of |error|_2, we convert this to addition precision loss via sqrt(n) * sigma / |error|_2
-    additional_precision_loss = lambda logn, log_sigma, log_total_noise: (logn / 2 + log_sigma - log_total_noise).n()
+    ATA_bound = ATA_bound or worst_case_ATA(n)
     
     absolute_noise = {"bit_security": [], "hint_lwe": []}
     
     additional_noise = {"bit_security": [], "hint_lwe": []}
     
     # a (2 norm) bound on the noise due to rescaling, ([A]_q * s - [b]_q ) / q
-    rescaling_noise = (sqrt(worst_case_ATA(n)) * sqrt(n) * sigma_s + 0.5).n()
+    rescaling_noise = math.sqrt(ATA_bound) * math.sqrt(n) * sigma_s + 0.5
     
-    cross_over_point = log(rescaling_noise, 2).n()
+    cross_over_point = math.log2(rescaling_noise)
+    
+    if log_normalised_flooding_stddev is None:
+        return cross_over_point, absolute_noise, additional_noise
     
     # this is the security we target for HintLWE (Search)
     kappa_prime = target_security + 1
-    print(f"targetting hintLWE security = {kappa_prime}")
-    
-    try:
-        [(_, log_normalised_flooding_stddev)] = hint_lwe_search_normalised_noise_flooding([parameters], kappa_prime)
-    except:
-        ValueError(f"cannot achieve {target_security=} via reduction: try increasing secret variance or decreasing target security")
-        return cross_over_point, absolute_noise, additional_noise
     
     for rescaled_noise_magnitude in range(1, max_rescaled_noise_magnitude + 1):
         # first we calculate a bound on the total noise from the bound on the rescaled noise magnitude. All in 2 norm
         total_noise = 2 ** rescaled_noise_magnitude + rescaling_noise
-        log_total_noise = log(total_noise, 2)
+        log_total_noise = math.log2(total_noise)
         
         bit_security_flooding_noise_ = bit_security_flooding_noise(t, log_total_noise, original_security, target_security)
         absolute_noise["bit_security"].append((rescaled_noise_magnitude, bit_security_flooding_noise_))
         bit_security_precision_loss = additional_precision_loss(logn, bit_security_flooding_noise_, log_total_noise)
         additional_noise["bit_security"].append((rescaled_noise_magnitude, bit_security_precision_loss))
         
-        hint_lwe_flooding_noise_ = hint_lwe_flooding_noise(t, rescaled_noise_magnitude, kappa_prime, target_security, n, log_normalised_flooding_stddev)
-        absolute_noise["hint_lwe"].append((rescaled_noise_magnitude, hint_lwe_flooding_noise_.n()))
+        hint_lwe_flooding_noise_ = hint_lwe_flooding_noise(t, rescaled_noise_magnitude, kappa_prime, target_security, n, log_normalised_flooding_stddev, ATA_bound)
+        absolute_noise["hint_lwe"].append((rescaled_noise_magnitude, hint_lwe_flooding_noise_))
         hint_lwe_precision_loss = additional_precision_loss(logn, hint_lwe_flooding_noise_, log_total_noise)
-        additional_noise["hint_lwe"].append((rescaled_noise_magnitude, hint_lwe_precision_loss.n()))
+        additional_noise["hint_lwe"].append((rescaled_noise_magnitude, hint_lwe_precision_loss))
     
     return cross_over_point, absolute_noise, additional_noise
-        
+
+# flooding_noise_levels for several parameter sets, each with its own original security level, returned in input order.
+# workers: the number of processes over which to spread the parameter sets, see executor.py
+# ATA_bounds: an optional bound on |[A]_q / q|_2^2 for each parameter set, see flooding_noise_curves
+def flooding_noise_levels_table(parameter_sets, t, original_security_levels, target_security, max_rescaled_noise_magnitude=40, workers=1, ATA_bounds=None):
+    ATA_bounds = ATA_bounds or [None] * len(parameter_sets)
+    rows = [(parameters, t, original_security, target_security, max_rescaled_noise_magnitude, ATA_bound) for parameters, original_security, ATA_bound in zip(parameter_sets, original_security_levels, ATA_bounds)]
+    return map_rows(flooding_noise_levels, rows, workers, progress=workers > 1)
+    
 if __name__ == "__main__":
     # this script generates the data for Fig 4
     target_security = 120
@@ -73,16 +99,12 @@ if __name__ == "__main__":
         (14, 432, 3.19, 3.19),
         (16, 1749, 3.19, 3.19)
         ]
-    original_security_levels = [
-        131.903812370381,
-        128.934036200343,
-        128.334392294043,
-        128.021734664213
-        ]
+    # the original security levels are read from results/original_security.jsonl (see sweep.py), computing any that are missing
+    original_security_levels = sweep.original_security_levels(parameter_sets)
     
-    for parameters, original_security in zip(parameter_sets, original_security_levels):
+    table = flooding_noise_levels_table(parameter_sets, t, original_security_levels, target_security, workers=len(parameter_sets))
+    for parameters, (cross_over_point, absolute_noise, additional_noise) in zip(parameter_sets, table):
         print(f"# {parameters=}")
-        cross_over_point, absolute_noise, additional_noise = flooding_noise_levels(parameters, t, original_security, target_security)
         print(f"# cross over point (rescaling noise = rescaled noise) at {cross_over_point}")
         
         print("# absolute noise:")
@@ -0,0 +1,135 @@
+# the flooding noise curves of ind_cpa_d_security and kr_d_security as continuous functions of the rescaled noise magnitude x,
+# described exactly at their breakpoints rather than sampled on the integer grid 1..40.
+# two points matter:
+#   - the cross over point, where the rescaled noise 2^x equals the rescaling noise, and
+#   - the switch point, where the HintLWE flooding noise max(rescaled noise flooding, sigma_i) changes branch.
+# the switch point is found by root finding on the two branches of the max(). Between the breakpoints every curve is convex or
+# concave (log2(2^x + rescaling noise) is convex in x, and the HintLWE curve is linear), so the curves are refined adaptively into
+# piecewise-linear descriptions, with more knots only where they bend. Like the scalar formulas, this only uses floats.
+import math
+from ind_cpa_d_security import (worst_case_ATA, sigma_i, additional_precision_loss, prior_flooding_noise,
+                                bit_security_flooding_noise, hint_lwe_flooding_noise)
+import kr_d_security
+
+# the largest deviation of a piecewise-linear description from its curve, in bits
+TOLERANCE = 1e-4
+
+# the x in [lo, hi] where the increasing function f crosses zero, to floating point precision, or None if it does not
+def increasing_root(f, lo, hi):
+    if f(lo) > 0 or f(hi) < 0:
+        return None
+    while True:
+        mid = (lo + hi) / 2
+        if mid in (lo, hi):
+            return mid
+        if f(mid) < 0:
+            lo = mid
+        else:
+            hi = mid
+
+# knots (x, f(x)) of a piecewise-linear description of f on [lo, hi], deviating from f by at most `tolerance` when f is convex or
+# concave between consecutive breakpoints. Between breakpoints the deviation of the chord from f is then concave (or convex), so
+# it is at most twice its value at the midpoint, which we keep below tolerance / 2
+def piecewise_linear(f, lo, hi, breakpoints=(), tolerance=TOLERANCE):
+    xs = sorted({lo, hi} | {x for x in breakpoints if x is not None and lo < x < hi})
+    knots = [(xs[0], f(xs[0]))]
+    for x in xs[1:]:
+        knots += _refine(f, knots[-1], (x, f(x)), tolerance)
+    return knots
+
+def _refine(f, left, right, tolerance):
+    (a, fa), (b, fb) = left, right
+    mid = (a + b) / 2
+    fmid = f(mid)
+    if abs(fmid - (fa + fb) / 2) <= tolerance / 2 or mid in (a, b):
+        return [right]
+    return _refine(f, left, (mid, fmid), tolerance) + _refine(f, (mid, fmid), right, tolerance)
+
+# the value at x of the piecewise-linear description `knots`
+def interpolate(knots, x):
+    if not knots[0][0] <= x <= knots[-1][0]:
+        raise ValueError(f"{x} is outside [{knots[0][0]}, {knots[-1][0]}]")
+    lo, hi = 0, len(knots) - 1
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if knots[mid][0] <= x:
+            lo = mid
+        else:
+            hi = mid
+    (a, fa), (b, fb) = knots[lo], knots[hi]
+    return fa if a == b else fa + (fb - fa) * (x - a) / (b - a)
+
+def _rescaling_noise(parameters, ATA_bound):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    n = 2 ** logn
+    return math.sqrt(ATA_bound or worst_case_ATA(n)) * math.sqrt(n) * sigma_s + 0.5
+
+# the breakpoints and piecewise-linear curves, as a dict with the same curves as flooding_noise_curves
+def _piecewise_curves(logn, rescaling_noise, absolute_curves, switch_point, lo, hi, tolerance):
+    def log_total_noise(x):
+        return math.log2(2 ** x + rescaling_noise)
+    cross_over_point = math.log2(rescaling_noise)
+    breakpoints = (cross_over_point, switch_point)
+    absolute_noise, additional_noise = {}, {}
+    for key, curve in absolute_curves.items():
+        absolute_noise[key] = piecewise_linear(curve, lo, hi, breakpoints, tolerance)
+        additional_noise[key] = piecewise_linear(lambda x, curve=curve: additional_precision_loss(logn, curve(x), log_total_noise(x)), lo, hi, breakpoints, tolerance)
+    return {"cross_over_point": cross_over_point, "switch_point": switch_point, "absolute_noise": absolute_noise, "additional_noise": additional_noise}
+
+# the IND-CPA-D curves of ind_cpa_d_security.flooding_noise_curves, for rescaled noise magnitudes in [lo, hi].
+# switch_point is the rescaled noise magnitude above which the HintLWE flooding noise follows the rescaled noise, or None if the
+# branch does not change in [lo, hi]
+def ind_cpa_d_piecewise_curves(parameters, t, original_security, target_security, log_normalised_flooding_stddev, lo=1, hi=40, tolerance=TOLERANCE, ATA_bound=None):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    n = 2 ** logn
+    ATA_bound = ATA_bound or worst_case_ATA(n)
+    rescaling_noise = _rescaling_noise(parameters, ATA_bound)
+    def log_total_noise(x):
+        return math.log2(2 ** x + rescaling_noise)
+    curves = {}
+    # the same conditions on the gap between IND-CPA and IND-CPA-D security as flooding_noise_curves
+    if original_security - target_security >= 8:
+        curves["prior"] = lambda x: prior_flooding_noise(t, log_total_noise(x), target_security)
+    if original_security - target_security >= 4:
+        curves["bit_security"] = lambda x: bit_security_flooding_noise(log_total_noise(x), target_security)
+    curves["hint_lwe"] = lambda x: hint_lwe_flooding_noise(t, x, target_security, n, log_normalised_flooding_stddev, ATA_bound)
+    sigma_i_ = sigma_i(t, ATA_bound, log_normalised_flooding_stddev)
+    switch_point = increasing_root(lambda x: bit_security_flooding_noise(x, target_security) - sigma_i_, lo, hi)
+    return _piecewise_curves(logn, rescaling_noise, curves, switch_point, lo, hi, tolerance)
+
+# the KR-D curves of kr_d_security.flooding_noise_curves, as ind_cpa_d_piecewise_curves
+def kr_d_piecewise_curves(parameters, t, original_security, target_security, log_normalised_flooding_stddev, lo=1, hi=40, tolerance=TOLERANCE, ATA_bound=None):
+    (logn, logq, sigma_s, sigma_e) = parameters
+    n = 2 ** logn
+    ATA_bound = ATA_bound or worst_case_ATA(n)
+    rescaling_noise = _rescaling_noise(parameters, ATA_bound)
+    # this is the security we target for HintLWE (Search)
+    kappa_prime = target_security + 1
+    def log_total_noise(x):
+        return math.log2(2 ** x + rescaling_noise)
+    curves = {
+        "bit_security": lambda x: kr_d_security.bit_security_flooding_noise(t, log_total_noise(x), original_security, target_security),
+        "hint_lwe": lambda x: kr_d_security.hint_lwe_flooding_noise(t, x, kappa_prime, target_security, n, log_normalised_flooding_stddev, ATA_bound),
+    }
+    sigma_i_ = sigma_i(t, ATA_bound, log_normalised_flooding_stddev)
+    switch_point = increasing_root(lambda x: kr_d_security.bit_security_flooding_noise(t, x, kappa_prime, target_security) - sigma_i_, lo, hi)
+    return _piecewise_curves(logn, rescaling_noise, curves, switch_point, lo, hi, tolerance)
+
+if __name__ == "__main__":
+    # compare with the integer grid of Figs 3 and 4, for an example normalised flooding stddev
+    from ind_cpa_d_security import flooding_noise_curves
+    parameters, original_security, log_normalised_flooding_stddev = (12, 108, 3.19, 3.19), 128.934036200343, 2.0
+    for name, piecewise_curves, grid_curves, target_security in [
+        ("ind_cpa_d", ind_cpa_d_piecewise_curves, flooding_noise_curves, 80),
+        ("kr_d", kr_d_piecewise_curves, kr_d_security.flooding_noise_curves, 120),
+    ]:
+        curves = piecewise_curves(parameters, 2 ** 6, original_security, target_security, log_normalised_flooding_stddev)
+        _, absolute_noise, additional_noise = grid_curves(parameters, 2 ** 6, original_security, target_security, log_normalised_flooding_stddev)
+        deviation = max(
+            abs(interpolate(curves[section][key], x) - value)
+            for section, grid in (("absolute_noise", absolute_noise), ("additional_noise", additional_noise))
+            for key in grid for x, value in grid[key]
+        )
+        knots = sum(len(knots) for section in ("absolute_noise", "additional_noise") for knots in curves[section].values())
+        print(f"# {name}: cross over point {curves['cross_over_point']}, switch point {curves['switch_point']}, "
+              f"{knots} knots in total, largest deviation from the integer grid {deviation:.2e} bits")
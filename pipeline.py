@@ -0,0 +1,177 @@
+# the figure pipeline as a dependency graph. The stages are
+#   LWE hardness -> HintLWE (Decision/Search) flooding stddev -> IND-CPA-D and KR-D flooding noise
+# and each node is one stage applied to one parameter row. A node's fingerprint covers its function, the source of the modules the
+# function calls into (see STAGE_MODULES), its arguments and the fingerprints of the nodes it depends on, and its result is stored
+# under results/pipeline/ by fingerprint. Changing t, the target security or a parameter row therefore only recomputes the nodes
+# downstream of the change: the estimator-backed nodes upstream are loaded from disk. Editing a module recomputes the nodes of every
+# stage that uses it.
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+from functools import lru_cache
+from executor import imap_rows
+from hardness_cache import estimator_version
+from sweep import RESULTS_DIR, as_stored, original_security
+
+PIPELINE_DIR = os.path.join(RESULTS_DIR, "pipeline")
+
+# a hash of the source of the module `name`, found without importing it, or None if it can't be found.
+# for a package (the lattice estimator) this is its version, see hardness_cache.estimator_version
+@lru_cache(maxsize=None)
+def module_fingerprint(name):
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        return None
+    if spec.submodule_search_locations:
+        return estimator_version(os.path.dirname(os.path.abspath(spec.origin)))
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class Node:
+    # the result of function(*[dependency results], *args)
+    def __init__(self, name, function, args=(), dependencies=()):
+        self.name = name
+        self.function = function
+        self.args = tuple(args)
+        self.dependencies = tuple(dependencies)
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            description = {
+                "function": f"{self.function.__module__}.{self.function.__qualname__}",
+                "source": hashlib.sha256(inspect.getsource(self.function).encode()).hexdigest(),
+                "modules": {name: module_fingerprint(name) for name in STAGE_MODULES.get(self.function, (self.function.__module__,))},
+                "args": self.args,
+                "dependencies": [dependency.fingerprint for dependency in self.dependencies],
+            }
+            self._fingerprint = hashlib.sha256(json.dumps(description, sort_keys=True, default=float).encode()).hexdigest()
+        return self._fingerprint
+
+    def __repr__(self):
+        return f"{self.name}{self.args}"
+
+def _run_node(function, dependency_results, args):
+    return function(*dependency_results, *args)
+
+class Pipeline:
+    def __init__(self, directory=PIPELINE_DIR):
+        self.directory = directory
+        self.nodes = {}
+        # the nodes computed (rather than loaded) by the last call to run
+        self.recomputed = []
+
+    # add a node, or return the existing node with the same fingerprint
+    def node(self, name, function, args=(), dependencies=()):
+        node = Node(name, function, args, dependencies)
+        return self.nodes.setdefault(node.fingerprint, node)
+
+    def _path(self, node):
+        return os.path.join(self.directory, f"{node.name}-{node.fingerprint[:16]}.json")
+
+    def _load(self, node):
+        try:
+            with open(self._path(node)) as f:
+                return True, json.load(f)["result"]
+        except (OSError, ValueError):
+            return False, None
+
+    def _store(self, node, result):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(node)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"node": repr(node), "result": result}, f, default=float)
+        os.replace(path + ".tmp", path)
+
+    # the results of the target nodes, computing only the nodes whose stored result is missing.
+    # nodes whose dependencies are ready run together, over `workers` processes
+    def run(self, targets, workers=1):
+        results = {}
+        pending = []
+        # find every node the targets depend on, in dependency order
+        def visit(node, seen):
+            if node.fingerprint in seen:
+                return
+            seen.add(node.fingerprint)
+            for dependency in node.dependencies:
+                visit(dependency, seen)
+            found, result = self._load(node)
+            if found:
+                results[node.fingerprint] = result
+            else:
+                pending.append(node)
+        seen = set()
+        for target in targets:
+            visit(target, seen)
+
+        self.recomputed = []
+        while pending:
+            ready = [node for node in pending if all(dependency.fingerprint in results for dependency in node.dependencies)]
+            pending = [node for node in pending if node not in ready]
+            rows = [(node.function, [results[dependency.fingerprint] for dependency in node.dependencies], node.args) for node in ready]
+            for index, result in imap_rows(_run_node, rows, workers):
+                result = as_stored(result)
+                self._store(ready[index], result)
+                results[ready[index].fingerprint] = result
+                self.recomputed.append(ready[index])
+        return [results[target.fingerprint] for target in targets]
+
+# the stages, with their inputs first
+
+def ind_cpa_d_flooding_stddev(parameters, target_security):
+    from ind_cpa_d_security import hint_lwe_normalised_flooding_stddev
+    return hint_lwe_normalised_flooding_stddev(tuple(parameters), target_security)
+
+def ind_cpa_d_noise(original_security, log_normalised_flooding_stddev, parameters, t, target_security, max_rescaled_noise_magnitude=40, ATA_bound=None):
+    from ind_cpa_d_security import flooding_noise_curves
+    return flooding_noise_curves(tuple(parameters), t, original_security, target_security, log_normalised_flooding_stddev, max_rescaled_noise_magnitude, ATA_bound)
+
+def kr_d_flooding_stddev(parameters, target_security):
+    from kr_d_security import hint_lwe_normalised_flooding_stddev
+    return hint_lwe_normalised_flooding_stddev(tuple(parameters), target_security)
+
+def kr_d_noise(original_security, log_normalised_flooding_stddev, parameters, t, target_security, max_rescaled_noise_magnitude=40, ATA_bound=None):
+    from kr_d_security import flooding_noise_curves
+    return flooding_noise_curves(tuple(parameters), t, original_security, target_security, log_normalised_flooding_stddev, max_rescaled_noise_magnitude, ATA_bound)
+
+# the modules each stage calls into, including the lattice estimator for the estimator-backed stages
+_HARDNESS_MODULES = ("utils", "hardness_cache", "warm_start", "estimator")
+STAGE_MODULES = {
+    original_security: ("sweep", *_HARDNESS_MODULES),
+    ind_cpa_d_flooding_stddev: ("ind_cpa_d_security", "hintLWE_security", *_HARDNESS_MODULES),
+    ind_cpa_d_noise: ("ind_cpa_d_security",),
+    kr_d_flooding_stddev: ("kr_d_security", "hintLWE_security", *_HARDNESS_MODULES),
+    kr_d_noise: ("kr_d_security", "ind_cpa_d_security"),
+}
+
+# the IND-CPA-D (Fig 3) and KR-D (Fig 4) nodes for each parameter row: returns the pipeline, and dicts from row to the final node of each figure
+# ATA_bounds: an optional bound on |[A]_q / q|_2^2 for each parameter row, see ind_cpa_d_security.flooding_noise_curves
+def figure_pipeline(parameter_sets, ind_cpa_d_t, ind_cpa_d_target_security, kr_d_t, kr_d_target_security, pipeline=None, max_rescaled_noise_magnitude=40, ATA_bounds=None):
+    pipeline = pipeline or Pipeline()
+    ATA_bounds = ATA_bounds or [None] * len(parameter_sets)
+    ind_cpa_d, kr_d = {}, {}
+    for parameters, ATA_bound in zip(parameter_sets, ATA_bounds):
+        original = pipeline.node("original_security", original_security, parameters)
+        stddev = pipeline.node("ind_cpa_d_flooding_stddev", ind_cpa_d_flooding_stddev, (parameters, ind_cpa_d_target_security))
+        args = (parameters, ind_cpa_d_t, ind_cpa_d_target_security, max_rescaled_noise_magnitude, ATA_bound)
+        ind_cpa_d[parameters] = pipeline.node("ind_cpa_d_noise", ind_cpa_d_noise, args, (original, stddev))
+        stddev = pipeline.node("kr_d_flooding_stddev", kr_d_flooding_stddev, (parameters, kr_d_target_security))
+        args = (parameters, kr_d_t, kr_d_target_security, max_rescaled_noise_magnitude, ATA_bound)
+        kr_d[parameters] = pipeline.node("kr_d_noise", kr_d_noise, args, (original, stddev))
+    return pipeline, ind_cpa_d, kr_d
+
+if __name__ == "__main__":
+    # the data for Figs 3 and 4. Re-running this after changing e.g. t only recomputes the closed-form noise nodes
+    parameter_sets = [
+        (10, 28, 3.19, 3.19),
+        (12, 108, 3.19, 3.19),
+        (14, 432, 3.19, 3.19),
+        (16, 1749, 3.19, 3.19)
+    ]
+    pipeline, ind_cpa_d, kr_d = figure_pipeline(parameter_sets, 2 ** 6, 80, 2 ** 6, 120)
+    targets = list(ind_cpa_d.values()) + list(kr_d.values())
+    pipeline.run(targets, workers=len(parameter_sets))
+    print(f"# recomputed {len(pipeline.recomputed)} of {len(pipeline.nodes)} nodes: {pipeline.recomputed}")
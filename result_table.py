@@ -0,0 +1,142 @@
+# columnar containers for sweep results, in place of dicts of lists of (magnitude, bits) or (logn, bits) tuples. A ResultTable is
+# a NumPy structured array with one row per point, sorted by its key columns, so that
+#   - a column (table["absolute"]) or a range of rows (table[:1000]) is a view, not a copy,
+#   - the rows sharing a prefix of the key columns (table.select(method="hint_lwe", logn=14)) are a contiguous view, and
+#   - a table saves to a .npy file that loads memory-mapped, so million-point sweeps load instantly and are only paged in as read.
+# missing values (e.g. a reduction that gives nothing) are NaN.
+import numpy as np
+
+# the flooding noise methods of ind_cpa_d_security and kr_d_security, stored by their index here
+METHODS = ("prior", "bit_security", "hint_lwe")
+
+# a point of the flooding noise curves: the noise in bits of `method` for the parameters, t, target security and rescaled noise magnitude
+FLOODING_DTYPE = np.dtype([
+    ("method", "u1"), ("logn", "i2"), ("logq", "i4"), ("t", "f8"), ("target_security", "f8"), ("magnitude", "f8"),
+    ("absolute", "f8"), ("additional", "f8"),
+])
+# a HintLWE result for a parameter row and security level, e.g. a kappa_prime or a normalised flooding stddev
+LEVELS_DTYPE = np.dtype([("logn", "i2"), ("security_level", "f8"), ("value", "f8")])
+
+# the columns holding results: every other column is a key, and rows are sorted by the keys in column order
+VALUE_COLUMNS = ("absolute", "additional", "value")
+
+class ResultTable:
+    def __init__(self, rows, sort=True):
+        self.rows = rows
+        self.keys = [name for name in rows.dtype.names if name not in VALUE_COLUMNS]
+        if sort and len(rows) > 1:
+            self.rows = rows[np.lexsort([rows[key] for key in reversed(self.keys)])]
+
+    # a table from columns of equal (or broadcastable) shape, flattened. Method names are converted to their index in METHODS
+    @classmethod
+    def from_columns(cls, dtype, **columns):
+        if "method" in columns and isinstance(columns["method"], str):
+            columns["method"] = METHODS.index(columns["method"])
+        arrays = np.broadcast_arrays(*(np.asarray(columns[name]) for name in dtype.names))
+        rows = np.empty(arrays[0].size, dtype=dtype)
+        for name, array in zip(dtype.names, arrays):
+            rows[name] = array.ravel()
+        return cls(rows)
+
+    # the table of a (cross_over_point, absolute_noise, additional_noise) result of flooding_noise_curves or flooding_noise_levels
+    @classmethod
+    def from_flooding_curves(cls, parameters, t, target_security, curves):
+        (logn, logq, _, _) = parameters
+        _, absolute_noise, additional_noise = curves
+        tables = []
+        for method, points in absolute_noise.items():
+            magnitudes = [magnitude for magnitude, _ in points]
+            tables.append(cls.from_columns(
+                FLOODING_DTYPE, method=method, logn=logn, logq=logq, t=t, target_security=target_security, magnitude=magnitudes,
+                absolute=[float(noise) for _, noise in points], additional=[float(noise) for _, noise in additional_noise[method]],
+            ))
+        return concatenate(tables, FLOODING_DTYPE)
+
+    # the table of a list of (logn, value) pairs, as returned by the HintLWE functions, for a security level.
+    # rows of `parameters` missing from the list are stored as NaN
+    @classmethod
+    def from_levels(cls, values, security_level=np.nan, parameters=None):
+        values = dict(values)
+        logns = [logn for (logn, _, _, _) in parameters] if parameters is not None else list(values)
+        return cls.from_columns(
+            LEVELS_DTYPE, logn=logns, security_level=security_level,
+            value=[np.nan if values.get(logn) is None else float(values[logn]) for logn in logns],
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    # a column name gives a view of that column, and a slice a view of those rows
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return self.rows[index]
+        return ResultTable(self.rows[index], sort=False)
+
+    # the rows whose columns equal the given values. When the columns are a prefix of the keys, e.g. method, or method and logn, for
+    # flooding tables, the rows are contiguous and this is a view; otherwise it is a copy
+    def select(self, **columns):
+        if "method" in columns and isinstance(columns["method"], str):
+            columns["method"] = METHODS.index(columns["method"])
+        prefix = self.keys[:len(columns)]
+        if set(columns) != set(prefix):
+            mask = np.ones(len(self.rows), dtype=bool)
+            for name, value in columns.items():
+                mask &= self.rows[name] == value
+            return ResultTable(self.rows[mask], sort=False)
+        lo, hi = 0, len(self.rows)
+        for key in prefix:
+            column = self.rows[key][lo:hi]
+            lo, hi = lo + np.searchsorted(column, columns[key], "left"), lo + np.searchsorted(column, columns[key], "right")
+        return self[lo:hi]
+
+    # the (magnitude, noise) pairs of a curve, as in the dicts of flooding_noise_levels
+    def curve(self, method, logn, column="absolute", **columns):
+        rows = self.select(method=method, logn=logn)
+        if columns:
+            rows = rows.select(**columns)
+        return list(zip(rows["magnitude"].tolist(), rows[column].tolist()))
+
+    def save(self, path):
+        np.save(path, self.rows, allow_pickle=False)
+
+    # mmap: map the file rather than reading it, so that only the rows used are read
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False), sort=False)
+
+def concatenate(tables, dtype=None):
+    tables = list(tables)
+    if not tables:
+        return ResultTable(np.empty(0, dtype=dtype))
+    return ResultTable(np.concatenate([table.rows for table in tables]))
+
+# the table of the results of ind_cpa_d_security.flooding_noise_levels_table or kr_d_security.flooding_noise_levels_table
+def flooding_table(parameter_sets, t, target_security, results):
+    return concatenate((ResultTable.from_flooding_curves(parameters, t, target_security, curves) for parameters, curves in zip(parameter_sets, results)), FLOODING_DTYPE)
+
+if __name__ == "__main__":
+    # a million points of the IND-CPA-D curves, from the vectorised formulas of flooding_sweep
+    import os
+    import tempfile
+    import time
+    from flooding_sweep import ind_cpa_d_flooding_noise
+    logn, t, magnitude, target_security = np.meshgrid(np.arange(10, 18), 2.0 ** np.arange(0, 32), np.linspace(1, 40, 1000), [80, 100, 120], indexing="ij")
+    original_security, stddev = 128.0, 2.0
+    absolute_noise, additional_noise = ind_cpa_d_flooding_noise(logn, 3.19, t, magnitude, original_security, target_security, stddev)
+    table = concatenate(
+        ResultTable.from_columns(FLOODING_DTYPE, method=method, logn=logn, logq=0, t=t, target_security=target_security,
+                                 magnitude=magnitude, absolute=absolute_noise[method], additional=additional_noise[method])
+        for method in METHODS
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ind_cpa_d.npy")
+        start = time.perf_counter()
+        table.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = ResultTable.load(path)
+        hint_lwe = loaded.select(method="hint_lwe", logn=14)
+        loaded_time = time.perf_counter() - start
+        print(f"# {len(table)} points, {table.rows.nbytes / 2 ** 20:.1f} MiB: saved in {saved:.3f}s, "
+              f"loaded and selected {len(hint_lwe)} hint_lwe points for logn=14 in {loaded_time:.4f}s")
+        del loaded, hint_lwe
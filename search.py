@@ -0,0 +1,36 @@
+# monotone searches over integers, shared by the kappa_prime and security level searches of hintLWE_security and the inverse queries
+# of inverse_queries. Each finds the largest integer k in [lo, hi] with predicate(k) true, assuming predicate is true below some
+# threshold and false above it, and returns lo - 1 if the predicate is false everywhere. This file does not import sage.
+
+# bisection over [lo, hi]. Each k is evaluated at most once.
+def bisect_largest(lo, hi, predicate):
+    below, above = lo - 1, hi + 1
+    while above - below > 1:
+        mid = (below + above) // 2
+        if predicate(mid):
+            below = mid
+        else:
+            above = mid
+    return below
+
+# as bisect_largest, but first brackets the answer by stepping down from hi in doubling steps.
+# this costs a single evaluation when predicate(hi) holds, and O(log(hi - answer)) evaluations otherwise
+def bracket_largest(lo, hi, predicate):
+    above, step = hi + 1, 1
+    while above - step >= lo:
+        candidate = above - step
+        if predicate(candidate):
+            return bisect_largest(candidate + 1, above - 1, predicate) if above - 1 > candidate else candidate
+        above, step = candidate, 2 * step
+    return bisect_largest(lo, above - 1, predicate)
+
+# as bisect_largest, but first brackets the answer by stepping up from lo in doubling steps, so that small answers take few
+# evaluations even when hi is huge: O(log(answer - lo)) evaluations
+def gallop_largest(lo, hi, predicate):
+    below, step = lo - 1, 1
+    while below < hi:
+        candidate = min(below + step, hi)
+        if not predicate(candidate):
+            return bisect_largest(below + 1, candidate - 1, predicate)
+        below, step = candidate, 2 * step
+    return below
@@ -0,0 +1,177 @@
+# a local query service for flooding noise lookups, so that several people can share estimator work rather than each running the
+# scripts. Clients connect to a Unix socket and send one JSON request per line, e.g.
+#     {"query": "decision_flooding", "parameters": [12, 108, 3.19, 3.19], "security_level": 100}
+#     {"query": "search_flooding", "parameters": [12, 108, 3.19, 3.19], "security_level": 100}
+#     {"query": "ind_cpa_d_flooding_noise", "parameters": [12, 108, 3.19, 3.19], "t": 64, "target_security": 80}
+#     {"query": "kr_d_flooding_noise", "parameters": [12, 108, 3.19, 3.19], "t": 64, "target_security": 120}
+#     {"query": "stats"}
+# and receive one JSON line back, either {"result": ...} or {"error": ...}.
+# every estimator-backed step (the original security, and the HintLWE flooding stddev) is evaluated at most once:
+#   - finished steps are kept in memory and appended to results/service.jsonl, which is read back when the service restarts,
+#   - a step requested while it is already running waits for the running evaluation rather than starting another, and
+#   - new steps run on a process pool of bounded size.
+# the closed-form noise curves are cheap, and are computed in the service itself.
+#     python3 service.py [workers]
+import asyncio
+import json
+import os
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import ind_cpa_d_security
+import kr_d_security
+import pipeline
+import sweep
+from sweep import as_stored, load_sweep, results_path, row_key
+
+SOCKET_PATH = os.path.join(sweep.RESULTS_DIR, "service.sock")
+
+# the estimator-backed steps, by name
+STEPS = {
+    "original_security": sweep.original_security,
+    "decision_flooding": sweep.decision_flooding,
+    "search_flooding": sweep.search_flooding,
+    "ind_cpa_d_flooding_stddev": pipeline.ind_cpa_d_flooding_stddev,
+    "kr_d_flooding_stddev": pipeline.kr_d_flooding_stddev,
+}
+
+# the numeric fields each query needs besides its parameters
+QUERY_FIELDS = {
+    "decision_flooding": ("security_level",),
+    "search_flooding": ("security_level",),
+    "ind_cpa_d_flooding_noise": ("t", "target_security"),
+    "kr_d_flooding_noise": ("t", "target_security"),
+}
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+# the parameter row of a request, as (logn, logq, sigma_s, sigma_e), raising ValueError if it is missing or malformed
+def _parameters(request):
+    parameters = request.get("parameters")
+    if not isinstance(parameters, list) or len(parameters) != 4 or not all(_is_number(value) for value in parameters):
+        raise ValueError(f"parameters must be a list [logn, logq, sigma_s, sigma_e] of numbers, not {parameters!r}")
+    return [int(parameters[0]), int(parameters[1]), float(parameters[2]), float(parameters[3])]
+
+def _number(request, field):
+    if not _is_number(request.get(field)):
+        raise ValueError(f"{field} must be a number, not {request.get(field)!r}")
+    return request[field]
+
+class FloodingNoiseService:
+    def __init__(self, workers=2, path=None):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.path = path or results_path("service")
+        self.results = load_sweep(self.path)
+        self.in_flight = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "computed": 0, "errors": 0}
+
+    # the result of STEPS[step](*args), computing it at most once
+    async def evaluate(self, step, *args):
+        row = [step, *args]
+        key = row_key(row)
+        if key in self.results:
+            self.stats["cache_hits"] += 1
+            return self.results[key]
+        if key in self.in_flight:
+            self.stats["coalesced"] += 1
+        else:
+            self.in_flight[key] = asyncio.ensure_future(self._compute(row, key))
+        # a client going away must not cancel an evaluation that others may be waiting for
+        return await asyncio.shield(self.in_flight[key])
+
+    async def _compute(self, row, key):
+        step, *args = row
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.pool, STEPS[step], *args)
+            result = as_stored(result)
+            self.results[key] = result
+            self._store(row, result)
+            self.stats["computed"] += 1
+            return result
+        finally:
+            del self.in_flight[key]
+
+    def _store(self, row, result):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"row": row, "result": result}) + "\n")
+
+    async def _flooding_noise(self, security, stddev_step, parameters, t, target_security, max_rescaled_noise_magnitude=40):
+        original_security, stddev = await asyncio.gather(
+            self.evaluate("original_security", *parameters),
+            self.evaluate(stddev_step, parameters, target_security),
+        )
+        cross_over_point, absolute_noise, additional_noise = security.flooding_noise_curves(
+            tuple(parameters), t, original_security, target_security, stddev, max_rescaled_noise_magnitude
+        )
+        return {"cross_over_point": cross_over_point, "log_normalised_flooding_stddev": stddev, "absolute_noise": absolute_noise, "additional_noise": additional_noise}
+
+    # the answer to a single request, see the top of this file. The request is validated before any work is queued
+    async def answer(self, request):
+        query = request.get("query") if isinstance(request, dict) else None
+        if query == "stats":
+            return dict(self.stats, in_flight=len(self.in_flight), stored=len(self.results))
+        if query not in QUERY_FIELDS:
+            raise ValueError(f"unknown query {query!r}")
+        parameters = _parameters(request)
+        fields = [_number(request, field) for field in QUERY_FIELDS[query]]
+        if query in ("decision_flooding", "search_flooding"):
+            return await self.evaluate(query, *parameters, *fields)
+        max_rescaled_noise_magnitude = request.get("max_rescaled_noise_magnitude", 40)
+        if not isinstance(max_rescaled_noise_magnitude, int) or isinstance(max_rescaled_noise_magnitude, bool) or max_rescaled_noise_magnitude < 1:
+            raise ValueError(f"max_rescaled_noise_magnitude must be a positive integer, not {max_rescaled_noise_magnitude!r}")
+        if query == "ind_cpa_d_flooding_noise":
+            return await self._flooding_noise(ind_cpa_d_security, "ind_cpa_d_flooding_stddev", parameters, *fields, max_rescaled_noise_magnitude)
+        return await self._flooding_noise(kr_d_security, "kr_d_flooding_stddev", parameters, *fields, max_rescaled_noise_magnitude)
+
+    async def handle(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                self.stats["requests"] += 1
+                try:
+                    response = {"result": await self.answer(json.loads(line))}
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    response = {"error": f"{type(e).__name__}: {e}"}
+                writer.write((json.dumps(response, default=float) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+# run the service on a Unix socket at `path` until interrupted
+async def serve(path=SOCKET_PATH, workers=2):
+    service = FloodingNoiseService(workers)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    server = await asyncio.start_unix_server(service.handle, path)
+    print(f"# serving on {path} with {workers} workers", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+# send a single request to the service and return its result, raising RuntimeError with the service's message if it failed
+def query(request, path=SOCKET_PATH):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall((json.dumps(request) + "\n").encode())
+        with connection.makefile() as f:
+            response = json.loads(f.readline())
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["result"]
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    try:
+        asyncio.run(serve(workers=workers))
+    except KeyboardInterrupt:
+        pass
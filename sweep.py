@@ -0,0 +1,121 @@
+# a resumable sweep runner. Each row of a parameter grid is evaluated independently (see executor.py), and each finished row is
+# appended to a JSONL file as soon as it is done. Re-running a sweep skips the rows already in its file, so a crash only loses the
+# rows in flight, and later stages read their inputs from these files rather than from numbers pasted into the source.
+# sage and the lattice estimator are imported lazily, by the stage functions below, so reading results is cheap.
+import json
+import os
+from executor import imap_rows
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+def results_path(stage):
+    return os.path.join(RESULTS_DIR, f"{stage}.jsonl")
+
+# rows are tuples of arguments: we identify them by their JSON encoding
+def row_key(row):
+    return json.dumps(list(row))
+
+# sage numbers are stored as floats
+def _to_json(value):
+    try:
+        return float(value)
+    except TypeError:
+        raise TypeError(f"cannot store {value!r} of type {type(value).__name__} in a sweep file")
+
+# a result as it will be read back from a results file, e.g. with sage numbers as floats and tuples as lists, so that a result
+# used straight away matches the one loaded from disk on a later run
+def as_stored(result):
+    return json.loads(json.dumps(result, default=_to_json))
+
+# the finished rows of a sweep file, as a dict from row key to result.
+# a partially written last line (e.g. from a crash) is ignored
+def load_sweep(path):
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            results[row_key(record["row"])] = record["result"]
+    return results
+
+# evaluate function(*row) for each row not yet in the sweep file at `path`, appending each result as it finishes.
+# returns the results for all rows, in input order
+def run_sweep(function, rows, path, workers=1, progress=True):
+    rows = [tuple(row) for row in rows]
+    done = load_sweep(path)
+    pending = [row for row in rows if row_key(row) not in done]
+    if progress and len(rows) > len(pending):
+        print(f"# {os.path.basename(path)}: {len(rows) - len(pending)} of {len(rows)} rows already done")
+    if pending:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a+") as f:
+            # make sure a partially written last line stays on its own line
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                if f.read(1) != "\n":
+                    f.write("\n")
+            for finished, (index, result) in enumerate(imap_rows(function, pending, workers), start=1):
+                record = {"row": pending[index], "result": result}
+                f.write(json.dumps(record, default=_to_json) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+                done[row_key(pending[index])] = as_stored(result)
+                if progress:
+                    print(f"# {os.path.basename(path)}: finished {pending[index]} ({finished}/{len(pending)})", flush=True)
+    return [done[row_key(row)] for row in rows]
+
+# the stages of the pipeline, each taking a single row
+
+def original_security(logn, logq, sigma_s, sigma_e):
+    from utils import HE_standard_LWE_hardness
+    return HE_standard_LWE_hardness(logn, logq, sigma_s, sigma_e)
+
+# (kappa_prime, normalised flooding stddev) for the tightest decision reduction, or None
+def decision_security(logn, logq, sigma_s, sigma_e, original_kappa):
+    from hintLWE_security import decision_security_level
+    return decision_security_level((logn, logq, sigma_s, sigma_e), original_kappa, search="bisect")
+
+# (kappa_prime, normalised flooding stddev) for the tightest search reduction, or None
+def search_security(logn, logq, sigma_s, sigma_e, l_max=128):
+    from hintLWE_security import search_security_level
+    return search_security_level((logn, logq, sigma_s, sigma_e), l_max)
+
+# the normalised flooding stddev giving `security_level` bits of HintLWE (Decision) security, or None
+def decision_flooding(logn, logq, sigma_s, sigma_e, security_level):
+    from hintLWE_security import hint_lwe_decision_normalised_noise_flooding
+    stddevs = hint_lwe_decision_normalised_noise_flooding([(logn, logq, sigma_s, sigma_e)], security_level)
+    return stddevs[0][1] if stddevs else None
+
+# the normalised flooding stddev giving `security_level` bits of HintLWE (Search) security, or None
+def search_flooding(logn, logq, sigma_s, sigma_e, security_level):
+    from hintLWE_security import hint_lwe_search_normalised_noise_flooding
+    stddevs = hint_lwe_search_normalised_noise_flooding([(logn, logq, sigma_s, sigma_e)], security_level)
+    return stddevs[0][1] if stddevs else None
+
+# the original LWE security of each parameter row, computing (and storing) only the rows missing from results/original_security.jsonl
+def original_security_levels(parameters, workers=1, path=None):
+    return run_sweep(original_security, parameters, path or results_path("original_security"), workers)
+
+if __name__ == "__main__":
+    # the data for Fig 1 and 2, stored under results/
+    parameters = [
+        (10, 28, 3.19, 3.19),
+        (11, 55, 3.19, 3.19),
+        (12, 108, 3.19, 3.19),
+        (13, 216, 3.19, 3.19),
+        (14, 432, 3.19, 3.19),
+        (15, 870, 3.19, 3.19),
+        (16, 1749, 3.19, 3.19),
+        (17, 3525, 3.19, 3.19)
+    ]
+    workers = len(parameters)
+    original = original_security_levels(parameters, workers)
+    run_sweep(decision_security, [row + (kappa,) for row, kappa in zip(parameters, original)], results_path("decision_security"), workers)
+    run_sweep(search_security, parameters, results_path("search_security"), workers)
+    security_levels = [120, 100, 80]
+    run_sweep(decision_flooding, [row + (security_level,) for row in parameters for security_level in security_levels], results_path("decision_flooding"), workers)
+    run_sweep(search_flooding, [row + (security_level,) for row in parameters for security_level in security_levels], results_path("search_flooding"), workers)
@@ -1,36 +1,369 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import estimator
 from estimator import *
 from functools import partial
-from sage.all import oo, log
+from sage.all import oo, log, RR
+from hardness_cache import HardnessCache, default_cache, estimator_version
+import instrumentation
+import numpy as np
+
+# the reduction cost model of the HE Standard
+RED_COST_MODEL = RC.MATZOV
+
+# the attacks considered in the HE Standard, together with the settings we use for each of them
+ATTACK_SETTINGS = {
+    "primal_usvp": {},
+    "dual_hybrid": {},
+    "primal_bdd": {},
+    "primal_hybrid": {"mitm": False, "babai": False},
+}
+
+# the attacks we run for a ring dimension of 2 ** logn
+def attack_names(logn):
+    names = ["primal_usvp", "dual_hybrid", "primal_bdd"]
+    # when the parameters are small, we also consider the primal hybrid
+    if logn <= 14:
+        names.append("primal_hybrid")
+    return names
+
+def lwe_parameters(logn, logQ, secret_sigma, error_sigma=3.19):
+    return LWE.Parameters(2 ** logn, 2 ** logQ, Xs=ND.DiscreteGaussian(secret_sigma), Xe=ND.DiscreteGaussian(error_sigma), m=oo)
+
+# the cost of a single attack in bits. Any failure of the estimator is raised to the caller.
+# warm_start: an optional WarmStart, to start the attack's search from the optimum of the previous query with the same key (see warm_start.py)
+def attack_cost(name, params, warm_start=None, key=None):
+    if warm_start is not None and warm_start.supports(name):
+        cost = warm_start.run(name, params, key, RED_COST_MODEL)
+    else:
+        attack = partial(getattr(LWE, name), red_cost_model=RED_COST_MODEL, **ATTACK_SETTINGS[name])
+        cost = attack(params=params)
+    return float(log(cost["rop"], 2).n())
+
+# the outcome of a single attack: ("finished", cost in bits) or ("error", description of the failure)
+# params: the LWE.Parameters of the query, if the caller already built them
+def attack_outcome(name, logn, logQ, secret_sigma, error_sigma, warm_start=None, params=None):
+    try:
+        with instrumentation.timed(f"attack:{name}"):
+            params = params or lwe_parameters(logn, logQ, secret_sigma, error_sigma)
+            return "finished", attack_cost(name, params, warm_start, (logn, logQ, float(error_sigma)))
+    except Exception as e:
+        return "error", f"{type(e).__name__}: {e}"
+
+# the result of a hardness query: the status of every attack ("finished", "timeout" or "error"),
+# the cost in bits of each attack that finished, and the reason each other attack did not
+class HardnessReport:
+    def __init__(self, status, costs, errors):
+        self.status = status
+        self.costs = costs
+        self.errors = errors
+
+    @classmethod
+    def from_outcomes(cls, outcomes):
+        status = {name: state for name, (state, _) in outcomes.items()}
+        costs = {name: value for name, (state, value) in outcomes.items() if state == "finished"}
+        errors = {name: value for name, (state, value) in outcomes.items() if state != "finished"}
+        return cls(status, costs, errors)
+
+    # the lowest estimate in bits over the attacks that finished, or oo if none did
+    @property
+    def min_cost(self):
+        if not self.costs:
+            return oo
+        return RR(min(self.costs.values()))
+
+    # the attack achieving min_cost
+    @property
+    def min_attack(self):
+        if not self.costs:
+            return None
+        return min(self.costs, key=self.costs.get)
+
+    # True if some attack was abandoned, in which case min_cost is only an upper bound on the hardness
+    @property
+    def partial(self):
+        return any(state == "timeout" for state in self.status.values())
+
+    # True if every attack finished. Only complete reports are cached: an error may be transient, e.g. a worker killed for lack of memory
+    @property
+    def complete(self):
+        return all(state == "finished" for state in self.status.values())
+
+    def to_dict(self):
+        return {"status": self.status, "costs": self.costs, "errors": self.errors}
+
+    def __repr__(self):
+        return f"HardnessReport(min_cost={self.min_cost}, status={self.status})"
+
+_attack_pool = None
+
+# a process pool shared by all hardness queries, with one worker per attack
+def attack_pool():
+    global _attack_pool
+    if _attack_pool is None:
+        _attack_pool = ProcessPoolExecutor(max_workers=len(ATTACK_SETTINGS))
+    return _attack_pool
+
+# forget a pool one of whose workers died, so that the next query starts a new one
+def _reset_attack_pool():
+    global _attack_pool
+    if _attack_pool is not None:
+        _attack_pool.shutdown(wait=False, cancel_futures=True)
+        _attack_pool = None
+
+def _attack_process(connection, name, *args):
+    connection.send(attack_outcome(name, *args))
+    connection.close()
+
+# run each attack in its own process, abandoning it once it exceeds its budget in seconds (None for no limit).
+# with parallel=False the attacks run one after another
+def _attack_outcomes_with_budgets(names, args, budgets, parallel):
+    outcomes = {}
+    batches = [names] if parallel else [[name] for name in names]
+    for batch in batches:
+        running = {}
+        for name in batch:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_attack_process, args=(sender, name, *args), daemon=True)
+            process.start()
+            sender.close()
+            start = time.monotonic()
+            deadline = None if budgets[name] is None else start + budgets[name]
+            running[name] = (process, receiver, start, deadline)
+        for name, (process, receiver, start, deadline) in running.items():
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            if receiver.poll(timeout):
+                try:
+                    outcomes[name] = receiver.recv()
+                except EOFError:
+                    outcomes[name] = ("error", f"attack process exited with code {process.exitcode}")
+            else:
+                outcomes[name] = ("timeout", f"exceeded budget of {budgets[name]} seconds")
+            instrumentation.record(f"attack:{name}", time.monotonic() - start)
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            receiver.close()
+    return outcomes
+
+# the cache key of a hardness query, see hardness_cache.py
+def hardness_cache_key(logn, logQ, secret_sigma, error_sigma=3.19):
+    attacks = {name: ATTACK_SETTINGS[name] for name in attack_names(logn)}
+    version = estimator_version(os.path.dirname(os.path.abspath(estimator.__file__)))
+    return HardnessCache.key(logn, logQ, secret_sigma, error_sigma, attacks, type(RED_COST_MODEL).__name__, version)
+
+# run the attacks of the HE Standard and report on each of them, served from the persistent cache where possible.
+# parallel: run the attacks concurrently in a process pool, rather than one after another
+# budget: a wall-clock limit in seconds for each attack, either a single number or a dict from attack name to seconds.
+#   Attacks exceeding their budget are abandoned and reported as "timeout". Only reports where every attack finished are cached
+# warm_start: a WarmStart carried between consecutive queries of a scan over the secret stddev. This needs the attacks to run in this process.
+#   Warm-started reports are served from the cache but never stored in it, since they depend on the queries before them
+def HE_standard_LWE_hardness_report(logn, logQ, secret_sigma, error_sigma=3.19, use_cache=True, parallel=False, budget=None, warm_start=None):
+    if warm_start is not None and (parallel or budget is not None):
+        raise ValueError("warm starts need the attacks to run in this process: use parallel=False and budget=None")
+
+    instrumentation.count("hardness_queries")
+    with instrumentation.timed("HE_standard_LWE_hardness"):
+        report = _HE_standard_LWE_hardness_report(logn, logQ, secret_sigma, error_sigma, use_cache, parallel, budget, warm_start)
+    _count_report(report)
+    return report
+
+def _count_report(report):
+    for name, state in report.status.items():
+        instrumentation.count(f"attack:{name}:{state}")
+    if report.min_attack is not None:
+        instrumentation.count(f"minimum:{report.min_attack}")
+
+# the cached report of a hardness query, or None
+def cached_hardness_report(logn, logQ, secret_sigma, error_sigma, cache):
+    entry = cache.get(hardness_cache_key(logn, logQ, secret_sigma, error_sigma))
+    instrumentation.count("cache_misses" if entry is None else "cache_hits")
+    if entry is None:
+        return None
+    return HardnessReport(entry["status"], entry["costs"], entry["errors"])
+
+def _HE_standard_LWE_hardness_report(logn, logQ, secret_sigma, error_sigma, use_cache, parallel, budget, warm_start):
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        report = cached_hardness_report(logn, logQ, secret_sigma, error_sigma, cache)
+        if report is not None:
+            return report
+
+    names = attack_names(logn)
+    args = (logn, logQ, secret_sigma, error_sigma)
+    if budget is not None:
+        budgets = budget if isinstance(budget, dict) else dict.fromkeys(names, budget)
+        outcomes = _attack_outcomes_with_budgets(names, args, {name: budgets.get(name) for name in names}, parallel)
+    elif parallel:
+        start = time.monotonic()
+        futures = {attack_pool().submit(attack_outcome, name, *args): name for name in names}
+        # collect the attacks as they finish
+        outcomes = {}
+        for future in as_completed(futures):
+            try:
+                outcomes[futures[future]] = future.result()
+            except BrokenProcessPool as e:
+                # a worker died, e.g. killed for lack of memory: every attack still running in the pool is lost
+                outcomes[futures[future]] = ("error", f"{type(e).__name__}: {e}")
+            instrumentation.record(f"attack:{futures[future]}", time.monotonic() - start)
+        if any(isinstance(future.exception(), BrokenProcessPool) for future in futures):
+            _reset_attack_pool()
+    else:
+        outcomes = {name: attack_outcome(name, *args, warm_start) for name in names}
+    report = HardnessReport.from_outcomes({name: outcomes[name] for name in names})
+
+    if cache is not None and report.complete:
+        # a warm-started search depends on the queries before it, so only full searches are stored under the content address
+        if warm_start is None:
+            store_hardness_report(logn, logQ, secret_sigma, error_sigma, report, cache)
+        if report.min_attack is not None:
+            record_cheapest_attack(logn, logQ, report.min_attack, cache)
+    return report
+
+# the cache arguments below take a HardnessCache, None for no cache, or DEFAULT_CACHE for default_cache()
+DEFAULT_CACHE = object()
+
+def _resolve_cache(cache):
+    return default_cache() if cache is DEFAULT_CACHE else cache
+
+# store a report computed elsewhere (e.g. by distributed.py) in the hardness cache, as if the query had run here
+def store_hardness_report(logn, logQ, secret_sigma, error_sigma, report, cache=DEFAULT_CACHE):
+    cache = _resolve_cache(cache)
+    if cache is None:
+        return
+    key = hardness_cache_key(logn, logQ, secret_sigma, error_sigma)
+    min_cost = float(report.min_cost) if report.costs else None
+    cache.put(key, dict(report.to_dict(), params=[logn, logQ, float(secret_sigma), float(error_sigma)], min_cost=min_cost))
+
+# the attack history of a (logn, logQ) regime is the number of times each attack was found to be the cheapest, or ended a threshold query,
+# kept in the hardness cache. Concurrent updates may lose a count, which only makes the ordering slightly less informed
+def _history_key(logn, logQ):
+    attacks = {name: ATTACK_SETTINGS[name] for name in attack_names(logn)}
+    version = estimator_version(os.path.dirname(os.path.abspath(estimator.__file__)))
+    return HardnessCache.history_key(logn, logQ, attacks, type(RED_COST_MODEL).__name__, version)
+
+def attack_history(logn, logQ, cache=DEFAULT_CACHE):
+    cache = _resolve_cache(cache)
+    if cache is None:
+        return {}
+    entry = cache.get(_history_key(logn, logQ))
+    return entry["counts"] if entry is not None else {}
+
+def record_cheapest_attack(logn, logQ, name, cache=DEFAULT_CACHE):
+    cache = _resolve_cache(cache)
+    if cache is None:
+        return
+    counts = attack_history(logn, logQ, cache)
+    counts[name] = counts.get(name, 0) + 1
+    cache.put(_history_key(logn, logQ), {"params": [logn, logQ], "counts": counts})
+
+# the attacks of attack_names(logn), those most often the cheapest for this (logn, logQ) first, and otherwise in the usual order
+def attack_order(logn, logQ, cache=DEFAULT_CACHE):
+    counts = attack_history(logn, logQ, cache)
+    return sorted(attack_names(logn), key=lambda name: -counts.get(name, 0))
+
+# attacks costing less than threshold - THRESHOLD_SLACK end a threshold query early. The slack keeps the answer exact for callers that
+# compare the hardness against the threshold with a small tolerance (hintLWE_security uses 10 ** -10)
+THRESHOLD_SLACK = 1e-9
+
+# the LWE hardness in bits, good enough to compare against `threshold`: this is HE_standard_LWE_hardness when that is at least threshold,
+# and otherwise the cost of an attack below threshold, which may be higher than the hardness.
+# the attacks run in attack_order, and we stop at the first one below threshold, so a failing check usually costs a single attack.
+# when all the attacks run, the full report is cached as in HE_standard_LWE_hardness_report
+def HE_standard_LWE_threshold_hardness(logn, logQ, secret_sigma, error_sigma, threshold, use_cache=True, warm_start=None):
+    instrumentation.count("threshold_queries")
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        report = cached_hardness_report(logn, logQ, secret_sigma, error_sigma, cache)
+        if report is not None:
+            return report.min_cost
+
+    names = attack_order(logn, logQ, cache)
+    outcomes = {}
+    with instrumentation.timed("HE_standard_LWE_threshold_hardness"):
+        for name in names:
+            outcomes[name] = attack_outcome(name, logn, logQ, secret_sigma, error_sigma, warm_start)
+            state, cost = outcomes[name]
+            if state == "finished" and cost < threshold - THRESHOLD_SLACK:
+                instrumentation.count("threshold_early_exits")
+                instrumentation.count("threshold_attacks_skipped", len(names) - len(outcomes))
+                if cache is not None:
+                    record_cheapest_attack(logn, logQ, name, cache)
+                return RR(cost)
+
+    report = HardnessReport.from_outcomes({name: outcomes[name] for name in attack_names(logn)})
+    if cache is not None and report.complete:
+        if warm_start is None:
+            store_hardness_report(logn, logQ, secret_sigma, error_sigma, report, cache)
+        if report.min_attack is not None:
+            record_cheapest_attack(logn, logQ, report.min_attack, cache)
+    return report.min_cost
+
+# whether LWE with these parameters is at least `threshold` bits hard, see HE_standard_LWE_threshold_hardness
+def HE_standard_LWE_is_hard(logn, logQ, secret_sigma, error_sigma, threshold, use_cache=True, warm_start=None):
+    return HE_standard_LWE_threshold_hardness(logn, logQ, secret_sigma, error_sigma, threshold, use_cache, warm_start) >= threshold
+
+# the results of a batch of hardness queries, in query order: the report of each query, an array of their minimum costs in bits
+# (inf where no attack finished), and a dict from each attack to an array of its costs in bits (NaN where it did not run or finish)
+class HardnessBatch:
+    def __init__(self, reports):
+        self.reports = reports
+        self.min_costs = np.array([float(report.min_cost) for report in reports])
+        names = [name for name in ATTACK_SETTINGS if any(name in report.status for report in reports)]
+        self.costs = {name: np.array([report.costs.get(name, np.nan) for report in reports], dtype=float) for name in names}
+
+    def __len__(self):
+        return len(self.reports)
+
+# HE_standard_LWE_hardness_report for a list of (logn, logQ, secret_sigma, error_sigma) queries, returned as a HardnessBatch.
+# queries are grouped by (logn, logQ, error_sigma): each group builds its LWE parameters once and only swaps in the secret distribution of
+# each query, runs its queries in order of secret stddev, and evaluates repeated queries once.
+# warm_start: an optional WarmStart, as in HE_standard_LWE_hardness_report. It keeps the optimum of each group apart, so the primal uSVP
+#   search of each query starts from that of the previous secret stddev in its group
+def HE_standard_LWE_hardness_batch(queries, use_cache=True, warm_start=None):
+    queries = [(int(logn), int(logQ), secret_sigma, error_sigma) for (logn, logQ, secret_sigma, error_sigma) in queries]
+    cache = default_cache() if use_cache else None
+    groups = {}
+    for i, (logn, logQ, _, error_sigma) in enumerate(queries):
+        groups.setdefault((logn, logQ, float(error_sigma)), []).append(i)
+
+    reports = [None] * len(queries)
+    instrumentation.count("hardness_queries", len(queries))
+    for (logn, logQ, _), indices in groups.items():
+        base = None
+        done = {}
+        with instrumentation.timed("HE_standard_LWE_hardness_batch"):
+            for i in sorted(indices, key=lambda i: float(queries[i][2])):
+                _, _, secret_sigma, error_sigma = queries[i]
+                if float(secret_sigma) in done:
+                    reports[i] = done[float(secret_sigma)]
+                    continue
+                report = cached_hardness_report(logn, logQ, secret_sigma, error_sigma, cache) if cache is not None else None
+                if report is None:
+                    if base is None:
+                        base = lwe_parameters(logn, logQ, secret_sigma, error_sigma)
+                    params = base.updated(Xs=ND.DiscreteGaussian(secret_sigma))
+                    outcomes = {name: attack_outcome(name, logn, logQ, secret_sigma, error_sigma, warm_start, params) for name in attack_names(logn)}
+                    report = HardnessReport.from_outcomes(outcomes)
+                    if cache is not None and report.complete:
+                        if warm_start is None:
+                            store_hardness_report(logn, logQ, secret_sigma, error_sigma, report, cache)
+                        if report.min_attack is not None:
+                            record_cheapest_attack(logn, logQ, report.min_attack, cache)
+                _count_report(report)
+                reports[i] = done[float(secret_sigma)] = report
+    return HardnessBatch(reports)
 
 # this function returns the bit security according to the cost model, reduced basis shape, and attacks considered in the HE Standard.
 # See https://github.com/gong-cr/FHE-Security-Guidelines/ for further details.
-def HE_standard_LWE_hardness(logn, logQ, secret_sigma, error_sigma=3.19):
-    attacks = [
-        partial(LWE.primal_usvp, red_cost_model=RC.MATZOV),
-        partial(LWE.dual_hybrid, red_cost_model=RC.MATZOV),
-        partial(LWE.primal_bdd, red_cost_model=RC.MATZOV),
-    ]
-    
-    # when the parameters are small, we also consider the primal hybrid with the following settings
-    primal_hybrid = partial(LWE.primal_hybrid, mitm=False, babai=False, red_cost_model=RC.MATZOV)
-    
-    params = LWE.Parameters(2 ** logn, 2 ** logQ, Xs=ND.DiscreteGaussian(secret_sigma), Xe=ND.DiscreteGaussian(error_sigma), m=oo)
-    
-    # we loop through all the attacks, and return the lowest estimate in bits
-    min_cost = oo
-    for attack in attacks:
-        try:
-            cost = attack(params=params)
-            if log(cost["rop"], 2).n() < min_cost:
-                min_cost = log(cost["rop"], 2).n()
-        except:
-            continue
-    
-    if logn <= 14:
-        try:
-            cost = primal_hybrid(params=params)
-            if log(cost["rop"], 2).n() < min_cost:
-                min_cost = log(cost["rop"], 2).n()
-        except:
-            pass
-    return min_cost
\ No newline at end of file
+# HE_standard_LWE_hardness_report additionally reports which attacks finished.
+def HE_standard_LWE_hardness(logn, logQ, secret_sigma, error_sigma=3.19, use_cache=True, parallel=False, budget=None, warm_start=None):
+    report = HE_standard_LWE_hardness_report(logn, logQ, secret_sigma, error_sigma, use_cache, parallel, budget, warm_start)
+    if report.partial:
+        timed_out = [name for name, state in report.status.items() if state == "timeout"]
+        print(f"warning: {timed_out} timed out for {(logn, logQ, secret_sigma, error_sigma)}: {report.min_cost} bits is an upper bound")
+    # we return the lowest estimate in bits over all the attacks
+    return report.min_cost
@@ -0,0 +1,72 @@
+# warm-started attack estimates for monotone scans over the secret stddev, as in the kappa_prime and l loops of hintLWE_security.
+# consecutive queries there differ only slightly in the secret stddev, so the optimal block size barely moves. Rather than searching
+# all block sizes from 40 to 2n, we search a bracket around the previous optimum, and fall back to the full search if the optimum
+# lands on the edge of the bracket.
+# at the pinned estimator commit only the primal uSVP attack exposes its per-block-size cost (PrimalUSVP.cost_gsa); the other attacks
+# optimise their parameters internally, so they always run the full search. The dual and primal hybrids dominate the cost of a query,
+# so a warm start only removes the primal uSVP share of it: running this file measures that share on the l scan of hintLWE_security.
+# warm starts are opt-in (warm_start=True) and none of the scripts enable them.
+from estimator import *
+from estimator.util import local_minimum
+
+class WarmStart:
+    # width: the bracket searched is the previous optimal block size +/- width
+    def __init__(self, width=16):
+        self.width = width
+        self.betas = {}
+        self.warm_searches = 0
+        self.full_searches = 0
+        self.fallbacks = 0
+
+    def supports(self, name):
+        return name == "primal_usvp"
+
+    # the primal uSVP attack with the GSA shape model, searching block sizes in [beta_min, beta_max] exactly as LWE.primal_usvp does
+    @staticmethod
+    def _primal_usvp(params, red_cost_model, beta_min, beta_max):
+        # allow for a larger embedding lattice dimension: Bai and Galbraith
+        m = params.m + params.n if params.Xs <= params.Xe else params.m
+        with local_minimum(beta_min, beta_max, precision=5) as it:
+            for beta in it:
+                it.update(LWE.primal_usvp.cost_gsa(beta=beta, params=params, m=m, red_cost_model=red_cost_model))
+            for beta in it.neighborhood:
+                it.update(LWE.primal_usvp.cost_gsa(beta=beta, params=params, m=m, red_cost_model=red_cost_model))
+            cost = it.y
+        cost["tag"] = "usvp"
+        cost["problem"] = params
+        return cost.sanity_check()
+
+    # run the attack `name` on params. key identifies the scan this query belongs to, e.g. (logn, logQ, error_sigma)
+    def run(self, name, params, key, red_cost_model):
+        params = params.normalize()
+        lowest_beta, highest_beta = 40, max(2 * params.n, 41)
+        previous_beta = self.betas.get((name, key))
+        cost = None
+        if previous_beta is not None:
+            beta_min, beta_max = max(previous_beta - self.width, lowest_beta), min(previous_beta + self.width, highest_beta)
+            cost = self._primal_usvp(params, red_cost_model, beta_min, beta_max)
+            self.warm_searches += 1
+            # the optimum may lie outside the bracket: search everything
+            if (cost["beta"] <= beta_min and beta_min > lowest_beta) or (cost["beta"] >= beta_max and beta_max < highest_beta):
+                self.fallbacks += 1
+                cost = None
+        if cost is None:
+            cost = self._primal_usvp(params, red_cost_model, lowest_beta, highest_beta)
+            self.full_searches += 1
+        self.betas[(name, key)] = cost["beta"]
+        return cost
+
+if __name__ == "__main__":
+    # the l scan of hint_lwe_search_normalised_noise_flooding for one row, cold and warm, with the hardness cache off so that every
+    # query runs the attacks
+    import os
+    import instrumentation
+    from hintLWE_security import hint_lwe_search_normalised_noise_flooding
+    os.environ["HINTLWE_CACHE"] = "0"
+    parameters = [(12, 108, 3.19, 3.19)]
+    for warm_start in (False, True):
+        with instrumentation.instrument() as recorder:
+            result = hint_lwe_search_normalised_noise_flooding(parameters, 100, warm_start=warm_start)
+        attacks = {name: timer for name, timer in recorder.timers.items() if name.startswith("attack:")}
+        total = sum(seconds for _, seconds, _ in attacks.values())
+        print(f"# {warm_start=}: {result}, {total:.1f}s in the attacks, of which primal uSVP {attacks['attack:primal_usvp'][1]:.1f}s")